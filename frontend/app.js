@@ -6,6 +6,12 @@ let overviewRequestToken = 0;
 let teacherScoreDates = [];
 let teacherScoreDateIndex = 0;
 let teacherScoreContextKey = "";
+let teacherScoreRows = [];
+let teacherScoreCursor = null;
+let teacherScoresLoaded = false;
+const RECENT_DAYS = 30;
+const RECENT_ABSENCES_LIMIT = 50;
+const SCORE_PAGE_LIMIT = 50;
 let activeTeacherView = "overview";
 
 const STORAGE_MESSAGES = "ragMessages";
@@ -109,26 +115,6 @@ const average = (values) => {
   return Math.round((total / numeric.length) * 10) / 10;
 };
 
-const parseDate = (value) => {
-  const date = new Date(value);
-  if (Number.isNaN(date.getTime())) {
-    return null;
-  }
-  return date;
-};
-
-const filterRecentItems = (items, days) => {
-  const datedItems = items
-    .map((item) => ({ item, date: parseDate(item.date) }))
-    .filter((entry) => entry.date);
-  if (datedItems.length === 0) {
-    return [];
-  }
-  const maxTime = Math.max(...datedItems.map((entry) => entry.date.getTime()));
-  const cutoff = maxTime - days * 24 * 60 * 60 * 1000;
-  return datedItems.filter((entry) => entry.date.getTime() >= cutoff).map((entry) => entry.item);
-};
-
 const loadStorage = (key, fallback) => {
   try {
     const raw = localStorage.getItem(key);
@@ -926,7 +912,8 @@ const updateScoreNavigation = (dates) => {
   }
   const selectedDate = dates[teacherScoreDateIndex];
   scoresDay.textContent = selectedDate ? formatDate(selectedDate) : "—";
-  scoresPrev.disabled = !dates.length || teacherScoreDateIndex >= dates.length - 1;
+  scoresPrev.disabled =
+    !dates.length || (teacherScoreDateIndex >= dates.length - 1 && !teacherScoreCursor);
   scoresNext.disabled = !dates.length || teacherScoreDateIndex <= 0;
   return selectedDate;
 };
@@ -952,8 +939,13 @@ const fetchStudents = async () => {
   return response.json();
 };
 
-const fetchStudentData = async (studentId, subject) => {
+const fetchStudentData = async (studentId, subject, options = {}) => {
   const params = buildQueryParams(subject);
+  Object.entries(options).forEach(([key, value]) => {
+    if (value !== null && value !== undefined) {
+      params.set(key, String(value));
+    }
+  });
   const cacheKey = `${studentId}|${params.toString()}`;
   if (dataCache.has(cacheKey)) {
     return dataCache.get(cacheKey);
@@ -967,6 +959,20 @@ const fetchStudentData = async (studentId, subject) => {
   return payload;
 };
 
+const loadTeacherScorePage = async (studentId) => {
+  const contextKey = teacherScoreContextKey;
+  const data = await fetchStudentData(studentId, null, {
+    limit: SCORE_PAGE_LIMIT,
+    scores_before: teacherScoreCursor,
+  });
+  if (contextKey !== teacherScoreContextKey) {
+    return;
+  }
+  teacherScoreRows = teacherScoreRows.concat(data.scores ?? []);
+  teacherScoreCursor = data.scores_next ?? null;
+  teacherScoresLoaded = true;
+};
+
 const fetchOverview = async () => {
   const params = buildQueryParams();
   const response = await fetch(`/overview?${params.toString()}`);
@@ -1083,6 +1089,9 @@ const updateTeacherView = async () => {
   if (contextKey !== teacherScoreContextKey) {
     teacherScoreContextKey = contextKey;
     teacherScoreDateIndex = 0;
+    teacherScoreRows = [];
+    teacherScoreCursor = null;
+    teacherScoresLoaded = false;
   }
 
   if (teacherStudentEyebrow) {
@@ -1108,27 +1117,26 @@ const updateTeacherView = async () => {
   }
 
   try {
-    const data = await fetchStudentData(studentId, null);
+    const recent = await fetchStudentData(studentId, null, {
+      days: RECENT_DAYS,
+      limit: RECENT_ABSENCES_LIMIT,
+    });
+    if (!teacherScoresLoaded) {
+      await loadTeacherScorePage(studentId);
+    }
     if (requestToken !== teacherRequestToken) {
       return;
     }
 
-    const absences = data.absences ?? [];
-    const scores = data.scores ?? [];
+    const recentAbsences = recent.absences ?? [];
+    const scores = teacherScoreRows;
     const numericScores = scores
       .map((item) => item.score)
       .filter((score) => Number.isFinite(score));
+    const recentAverage = recent.scores_summary?.average;
 
-    const recentAbsences = filterRecentItems(absences, 30);
-    const recentScores = filterRecentItems(scores, 30);
-    const recentNumericScores = recentScores
-      .map((item) => item.score)
-      .filter((score) => Number.isFinite(score));
-
-    teacherMonthlyAbsences.textContent = recentAbsences.length;
-    teacherMonthlyAverage.textContent = recentNumericScores.length
-      ? average(recentNumericScores)
-      : "—";
+    teacherMonthlyAbsences.textContent = recent.absences_summary?.count ?? recentAbsences.length;
+    teacherMonthlyAverage.textContent = Number.isFinite(recentAverage) ? recentAverage : "—";
 
     const scoreDates = collectScoreDates(scores);
     const selectedDate = updateScoreNavigation(scoreDates);
@@ -1183,22 +1191,20 @@ const updateStudentView = async () => {
   }
 
   try {
-    const data = await fetchStudentData(studentId, null);
+    const data = await fetchStudentData(studentId, null, { limit: 0 });
     if (requestToken !== studentRequestToken) {
       return;
     }
 
-    const absences = data.absences ?? [];
-    const scores = data.scores ?? [];
-    const numericScores = scores
-      .map((item) => item.score)
-      .filter((score) => Number.isFinite(score));
-    const scoreAverage = average(numericScores);
-    const hasData = absences.length || scores.length;
-    const riskLevel = absences.length >= 3 || (numericScores.length && scoreAverage < 7);
+    const absencesCount = data.absences_summary?.count ?? 0;
+    const scoresCount = data.scores_summary?.count ?? 0;
+    const scoreAverage = data.scores_summary?.average;
+    const hasNumericScores = Number.isFinite(scoreAverage);
+    const hasData = absencesCount || scoresCount;
+    const riskLevel = absencesCount >= 3 || (hasNumericScores && scoreAverage < 7);
 
-    studentAbsencesCount.textContent = absences.length;
-    studentAverageScore.textContent = numericScores.length ? scoreAverage : "—";
+    studentAbsencesCount.textContent = absencesCount;
+    studentAverageScore.textContent = hasNumericScores ? scoreAverage : "—";
     studentStatus.textContent = hasData ? (riskLevel ? "Пильність" : "Активний") : "Немає даних";
     studentStatus.classList.toggle("warning", hasData && riskLevel);
 
@@ -1485,6 +1491,36 @@ const clearRagForm = () => {
   ragStatus.textContent = "Готові сформувати запит.";
 };
 
+const readEventStream = async (response, onEvent) => {
+  const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+  let buffer = "";
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) {
+      break;
+    }
+    buffer += value;
+    let boundary = buffer.indexOf("\n\n");
+    while (boundary !== -1) {
+      const frame = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      let event = "message";
+      const dataLines = [];
+      frame.split("\n").forEach((line) => {
+        if (line.startsWith("event:")) {
+          event = line.slice(6).trim();
+        } else if (line.startsWith("data:")) {
+          dataLines.push(line.slice(5).trimStart());
+        }
+      });
+      if (dataLines.length) {
+        onEvent(event, JSON.parse(dataLines.join("\n")));
+      }
+      boundary = buffer.indexOf("\n\n");
+    }
+  }
+};
+
 const requestRag = async () => {
   const topic = ragTopic.value.trim();
   const studentInfo = ragStudentInfo.value.trim();
@@ -1503,18 +1539,43 @@ const requestRag = async () => {
     student_info: studentInfo,
   };
 
+  let markdown = "";
+  let renderScheduled = false;
+  const scheduleRender = () => {
+    if (renderScheduled) {
+      return;
+    }
+    renderScheduled = true;
+    requestAnimationFrame(() => {
+      renderScheduled = false;
+      setRagOutput(markdown);
+    });
+  };
+
   try {
-    const response = await fetch("/answer", {
+    setRagOutput("");
+    quizQuestions = [];
+    const response = await fetch("/answer/stream", {
       method: "POST",
-      headers: { "Content-Type": "application/json" },
+      headers: { "Content-Type": "application/json", Accept: "text/event-stream" },
       body: JSON.stringify(payload),
     });
-    if (!response.ok) {
+    if (!response.ok || !response.body) {
       throw new Error(`HTTP ${response.status}`);
     }
-    const data = await response.json();
-    setRagOutput(data.result ?? "");
-    quizQuestions = data.quiz_questions ?? [];
+    await readEventStream(response, (event, data) => {
+      if (event === "topic") {
+        ragStatus.textContent = `Тема: ${data.title}. Генеруємо конспект...`;
+      } else if (event === "markdown") {
+        markdown += data.delta ?? "";
+        scheduleRender();
+      } else if (event === "quiz") {
+        quizQuestions = data.quiz_questions ?? [];
+      } else if (event === "error") {
+        throw new Error(data.detail ?? "stream error");
+      }
+    });
+    setRagOutput(markdown);
     ragStatus.textContent = "Відповідь готова до перегляду.";
     addActivity("RAG відповідь згенеровано", `Тема: ${topic}`);
   } catch (error) {
@@ -1582,6 +1643,7 @@ studentSelfSelect.addEventListener("change", updateStudentView);
 yearSelect.addEventListener("change", async () => {
   dataCache.clear();
   teacherScoreDateIndex = 0;
+  teacherScoreContextKey = "";
   await loadStudents();
   updateTeacherView();
   updateStudentView();
@@ -1607,11 +1669,20 @@ if (activityClear) {
   });
 }
 
-scoresPrev.addEventListener("click", () => {
-  if (teacherScoreDateIndex < teacherScoreDates.length - 1) {
+scoresPrev.addEventListener("click", async () => {
+  if (teacherScoreDateIndex >= teacherScoreDates.length - 1 && teacherScoreCursor) {
+    scoresPrev.disabled = true;
+    try {
+      await loadTeacherScorePage(teacherStudentSelect.value);
+    } catch (error) {
+      updateTeacherView();
+      return;
+    }
+  }
+  if (teacherScoreDateIndex < collectScoreDates(teacherScoreRows).length - 1) {
     teacherScoreDateIndex += 1;
-    updateTeacherView();
   }
+  updateTeacherView();
 });
 
 scoresNext.addEventListener("click", () => {
@@ -1,53 +1,289 @@
+import asyncio
+import hashlib
+import json
 import logging
 import sys
+import time
+from datetime import date
 from pathlib import Path
+from typing import AsyncIterator, Callable
 
-from fastapi import FastAPI, Query
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
+from pydantic import TypeAdapter
 
-from mriynyk.config import load_environment
+from mriynyk.config import load_environment, resolve_student_data_cache_max_age
+from mriynyk.db import close_connection_pools, pool_stats
+from mriynyk.jobs import MAX_JOB_WAIT_SECONDS, JobQueueFull, get_answer_jobs
+from mriynyk.llm import close_llm_clients
+from mriynyk.metrics import (
+    METRICS_CONTENT_TYPE,
+    get_metrics,
+    reset_request_timings,
+    server_timing_header,
+    start_request_timings,
+)
 from mriynyk.models import (
+    AnswerJob,
     OverviewResponse,
+    StreamEvent,
+    StudentBatchRequest,
+    StudentBatchResponse,
+    Subject,
     TopicRequest,
     TopicResponse,
     StudentDataResponse,
     StudentListItem,
 )
-from mriynyk.service import answer_request
-from mriynyk.student_data import get_overview, get_student_data, list_students
+from mriynyk.prompts import get_prompt_registry
+from mriynyk.service import answer_request, stream_answer_request
+from mriynyk.student_data import (
+    MAX_PAGE_LIMIT,
+    RECENT_DAYS,
+    HistoryWindow,
+    OverviewWindow,
+    data_stats,
+    data_version,
+    get_data_manager,
+    get_overview,
+    get_student_batch_json,
+    get_student_data_json,
+    list_students,
+)
+from mriynyk.warmup import WARMUP_STATE, warm_up
+from mriynyk.workbook_cache import get_workbook_cache
 
 app = FastAPI()
 FRONTEND_DIR = Path(__file__).resolve().parents[1] / "frontend"
 
 
 @app.on_event("startup")
-def handle_startup() -> None:
+async def handle_startup() -> None:
     logging.basicConfig(level=logging.INFO, stream=sys.stdout)
     load_environment()
+    get_data_manager().start()
+    get_answer_jobs().start()
+    # Runs in the background so /ready can answer 503 while the worker is still cold.
+    app.state.warmup_task = asyncio.create_task(warm_up(WARMUP_STATE))
+
+
+@app.on_event("shutdown")
+async def handle_shutdown() -> None:
+    warmup_task = getattr(app.state, "warmup_task", None)
+    if warmup_task is not None:
+        warmup_task.cancel()
+    get_data_manager().stop()
+    await get_answer_jobs().stop()
+    await close_connection_pools()
+    await close_llm_clients()
+
+
+@app.middleware("http")
+async def add_server_timing(request: Request, call_next: Callable) -> Response:
+    started = time.perf_counter()
+    timings, token = start_request_timings()
+    try:
+        response = await call_next(request)
+    finally:
+        reset_request_timings(token)
+    # Streaming responses send headers first, so they only carry the stages run before that.
+    response.headers["Server-Timing"] = server_timing_header(
+        timings, time.perf_counter() - started
+    )
+    return response
 
 
 @app.post("/answer", response_model=TopicResponse)
-def answer(request: TopicRequest) -> TopicResponse:
-    return answer_request(request)
+async def answer(request: TopicRequest) -> TopicResponse:
+    return await answer_request(request)
+
+
+@app.post("/jobs/answer", response_model=AnswerJob, status_code=202)
+async def submit_answer_job(request: TopicRequest, response: Response) -> AnswerJob:
+    try:
+        job = get_answer_jobs().submit(request)
+    except JobQueueFull as exc:
+        raise HTTPException(status_code=503, detail=str(exc), headers={"Retry-After": "5"})
+    response.headers["Location"] = f"/jobs/{job.job_id}"
+    return job
+
+
+@app.get("/jobs/stats")
+def answer_job_stats() -> dict[str, int]:
+    return get_answer_jobs().stats()
+
+
+@app.get("/jobs/{job_id}", response_model=AnswerJob)
+async def answer_job(
+    job_id: str,
+    wait: float = Query(0, ge=0, le=MAX_JOB_WAIT_SECONDS),
+) -> AnswerJob:
+    job = await get_answer_jobs().get(job_id, wait)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job.")
+    return job
+
+
+def format_sse(event: StreamEvent) -> str:
+    payload = json.dumps(event.data, ensure_ascii=False)
+    return f"event: {event.event}\ndata: {payload}\n\n"
+
+
+async def answer_event_stream(request: TopicRequest) -> AsyncIterator[str]:
+    try:
+        async for event in stream_answer_request(request):
+            yield format_sse(event)
+    except Exception:
+        logging.exception("Streaming /answer failed")
+        yield format_sse(StreamEvent("error", {"detail": "Generation failed."}))
+
+
+@app.post("/answer/stream")
+async def answer_stream(request: TopicRequest) -> StreamingResponse:
+    return StreamingResponse(
+        answer_event_stream(request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+STUDENT_LIST_ADAPTER = TypeAdapter(list[StudentListItem])
+
+
+def data_etag(request: Request) -> str:
+    # Same data version + same path and query = same body.
+    key = json.dumps(
+        [data_version(), request.url.path, sorted(request.query_params.multi_items())],
+        ensure_ascii=False,
+    )
+    return f'"{hashlib.sha1(key.encode("utf-8")).hexdigest()[:20]}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {value.strip().removeprefix("W/") for value in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def conditional_json(request: Request, build: Callable[[], bytes]) -> Response:
+    etag = data_etag(request)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"max-age={resolve_student_data_cache_max_age()}, must-revalidate",
+    }
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=build(), media_type="application/json", headers=headers)
 
 
 @app.get("/students", response_model=list[StudentListItem])
-def students(grade: int | None = Query(default=None, ge=1, le=12)) -> list[StudentListItem]:
-    return list_students(grade)
+def students(request: Request, grade: int | None = Query(default=None, ge=1, le=12)) -> Response:
+    return conditional_json(request, lambda: STUDENT_LIST_ADAPTER.dump_json(list_students(grade)))
+
+
+@app.post("/students/batch", response_model=StudentBatchResponse)
+def student_batch(request: StudentBatchRequest) -> Response:
+    window = HistoryWindow(date_from=request.date_from, date_to=request.date_to)
+    return Response(
+        content=get_student_batch_json(
+            student_ids=request.student_ids,
+            grade=request.grade,
+            subject=request.subject,
+            window=window,
+        ),
+        media_type="application/json",
+    )
 
 
 @app.get("/students/{student_id}", response_model=StudentDataResponse)
 def student_data(
+    request: Request,
     student_id: int,
     grade: int | None = Query(default=None, ge=1, le=12),
     subject: str | None = None,
-) -> StudentDataResponse:
-    return get_student_data(student_id=student_id, grade=grade, subject=subject)
+    limit: int | None = Query(default=None, ge=0, le=MAX_PAGE_LIMIT),
+    absences_before: date | None = None,
+    scores_before: date | None = None,
+    date_from: date | None = Query(default=None, alias="from"),
+    date_to: date | None = Query(default=None, alias="to"),
+    days: int | None = Query(default=None, ge=0),
+) -> Response:
+    window = HistoryWindow(
+        limit=limit,
+        absences_before=absences_before,
+        scores_before=scores_before,
+        date_from=date_from,
+        date_to=date_to,
+        days=days,
+    )
+    return conditional_json(
+        request,
+        lambda: get_student_data_json(
+            student_id=student_id, grade=grade, subject=subject, window=window
+        ),
+    )
 
 
 @app.get("/overview", response_model=OverviewResponse)
-def overview(grade: int | None = Query(default=None, ge=1, le=12)) -> OverviewResponse:
-    return get_overview(grade)
+def overview(
+    request: Request,
+    grade: int | None = Query(default=None, ge=1, le=12),
+    days: int | None = Query(default=None, ge=0),
+    date_from: date | None = Query(default=None, alias="from"),
+    date_to: date | None = Query(default=None, alias="to"),
+) -> Response:
+    if days is None and date_from is None and date_to is None:
+        days = RECENT_DAYS
+    window = OverviewWindow(days=days, date_from=date_from, date_to=date_to)
+    return conditional_json(
+        request, lambda: get_overview(grade, window).model_dump_json().encode("utf-8")
+    )
+
+
+@app.get("/ready")
+def ready() -> JSONResponse:
+    return JSONResponse(WARMUP_STATE.as_dict(), status_code=200 if WARMUP_STATE.ready else 503)
+
+
+@app.get("/data/version")
+def student_data_version() -> dict[str, object]:
+    return data_stats()
+
+
+@app.get("/db/pool")
+def db_pool() -> dict[str, int]:
+    return pool_stats()
+
+
+@app.get("/prompts/stats")
+def prompt_stats() -> dict[str, dict[str, float]]:
+    return get_prompt_registry().stats()
+
+
+@app.get("/metrics")
+def metrics() -> Response:
+    return Response(get_metrics().render(), media_type=METRICS_CONTENT_TYPE)
+
+
+@app.get("/cache/workbooks")
+def workbook_cache_stats() -> dict[str, int]:
+    return get_workbook_cache().stats()
+
+
+@app.delete("/cache/workbooks")
+async def invalidate_workbook_cache(
+    grade: int | None = Query(default=None, ge=1, le=12),
+    subject: Subject | None = None,
+    topic_title: str | None = None,
+) -> dict[str, int]:
+    invalidated = await get_workbook_cache().invalidate(
+        grade=grade,
+        discipline=subject.value if subject else None,
+        topic_title=topic_title,
+    )
+    return {"invalidated": invalidated}
 
 
 app.mount("/", StaticFiles(directory=FRONTEND_DIR, html=True), name="frontend")
@@ -0,0 +1,50 @@
+import logging
+import os
+import shutil
+from pathlib import Path
+
+import pandas as pd
+from pyarrow import feather
+
+logger = logging.getLogger(__name__)
+
+STORE_PREFIX = "students-"
+
+
+def store_dir(root: Path, version: str, compact: bool) -> Path:
+    mode = "compact" if compact else "full"
+    return root / f"{STORE_PREFIX}{version}-{mode}"
+
+
+def write_frame(dataframe: pd.DataFrame, path: Path) -> None:
+    # Written under a private name and renamed, so readers never map a partial file.
+    partial_path = path.with_name(f".{path.name}.{os.getpid()}")
+    feather.write_feather(dataframe, partial_path, compression="uncompressed")
+    os.replace(partial_path, path)
+
+
+def map_frame(path: Path) -> pd.DataFrame:
+    # Uncompressed IPC + memory_map: fixed-width columns share the page cache across workers.
+    table = feather.read_table(path, memory_map=True)
+    return table.to_pandas(split_blocks=True)
+
+
+def has_frames(directory: Path, names: tuple[str, ...]) -> bool:
+    return all((directory / f"{name}.arrow").exists() for name in names)
+
+
+def write_frames(directory: Path, frames: dict[str, pd.DataFrame]) -> None:
+    directory.mkdir(parents=True, exist_ok=True)
+    for name, dataframe in frames.items():
+        write_frame(dataframe, directory / f"{name}.arrow")
+
+
+def map_frames(directory: Path, names: tuple[str, ...]) -> dict[str, pd.DataFrame]:
+    return {name: map_frame(directory / f"{name}.arrow") for name in names}
+
+
+def prune_stores(root: Path, keep: Path) -> None:
+    # Unlinking is safe for workers still mapping an old version on POSIX.
+    for directory in root.glob(f"{STORE_PREFIX}*"):
+        if directory != keep and directory.is_dir():
+            shutil.rmtree(directory, ignore_errors=True)
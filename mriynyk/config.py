@@ -1,4 +1,6 @@
 import os
+import tempfile
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Final
 
@@ -7,6 +9,7 @@ from dotenv import load_dotenv
 
 ENV_FILE_PATH: Final[Path] = Path(".env")
 API_KEY_ENV_VARS: Final[tuple[str, ...]] = ("LAPATHON_API_KEY", "OPENAI_API_KEY")
+OPENAI_API_KEY_ENV_VAR: Final[str] = "OPENAI_API_KEY"
 DATABASE_URL_ENV_VARS: Final[tuple[str, ...]] = (
     "DATABASE_URL",
     "PG_DSN",
@@ -14,10 +17,139 @@ DATABASE_URL_ENV_VARS: Final[tuple[str, ...]] = (
 )
 LAPA_PROVIDER_BASE_URL: Final[str] = "http://146.59.127.106:4000"
 DEFAULT_SCHEMA_NAME: Final[str] = "public"
+PROJECT_ROOT: Final[Path] = Path(__file__).resolve().parents[1]
+PROMPTS_DIR: Final[Path] = PROJECT_ROOT / "prompts"
+PROMPT_BYTECODE_CACHE_ENV_VAR: Final[str] = "PROMPT_BYTECODE_CACHE_DIR"
 DEFAULT_TABLE_NAME: Final[str] = "pages_for_hackathon"
 DEFAULT_PAGE_TEXT_COLUMN: Final[str] = "page_text"
 DEFAULT_GRADE_COLUMN: Final[str] = "grade"
 DEFAULT_DISCIPLINE_COLUMN: Final[str] = "global_discipline_name"
+DEFAULT_VECTOR_COLUMN: Final[str] = "page_text_embedding"
+VECTOR_SEARCH_LIMIT_ENV_VAR: Final[str] = "VECTOR_SEARCH_LIMIT"
+HNSW_EF_SEARCH_ENV_VAR: Final[str] = "HNSW_EF_SEARCH"
+DEFAULT_VECTOR_SEARCH_LIMIT: Final[int] = 8
+DEFAULT_HNSW_EF_SEARCH: Final[int] = 40
+DEFAULT_TOPIC_CATALOGUE_TABLE_NAME: Final[str] = "pages_for_hackathon_topics"
+TOPIC_CATALOGUE_CHECK_ENV_VAR: Final[str] = "TOPIC_CATALOGUE_CHECK_SECONDS"
+DEFAULT_TOPIC_CATALOGUE_CHECK_SECONDS: Final[float] = 60.0
+CONTEXT_TOKEN_BUDGET_ENV_VAR: Final[str] = "CONTEXT_TOKEN_BUDGET"
+DEFAULT_CONTEXT_TOKEN_BUDGET: Final[int] = 6000
+EMBEDDING_MODEL_ENV_VAR: Final[str] = "EMBEDDING_MODEL"
+DEFAULT_EMBEDDING_MODEL: Final[str] = "text-embedding-qwen"
+TOPIC_MATCH_MIN_SCORE_ENV_VAR: Final[str] = "TOPIC_MATCH_MIN_SCORE"
+TOPIC_MATCH_MIN_MARGIN_ENV_VAR: Final[str] = "TOPIC_MATCH_MIN_MARGIN"
+TOPIC_MATCH_EMBEDDINGS_ENV_VAR: Final[str] = "TOPIC_MATCH_EMBEDDINGS"
+TOPIC_MATCH_MIN_SIMILARITY_ENV_VAR: Final[str] = "TOPIC_MATCH_MIN_SIMILARITY"
+TOPIC_MATCH_MIN_SIMILARITY_MARGIN_ENV_VAR: Final[str] = "TOPIC_MATCH_MIN_SIMILARITY_MARGIN"
+DEFAULT_TOPIC_MATCH_MIN_SCORE: Final[float] = 0.55
+DEFAULT_TOPIC_MATCH_MIN_MARGIN: Final[float] = 0.15
+DEFAULT_TOPIC_MATCH_MIN_SIMILARITY: Final[float] = 0.75
+DEFAULT_TOPIC_MATCH_MIN_SIMILARITY_MARGIN: Final[float] = 0.05
+DB_POOL_MIN_SIZE_ENV_VAR: Final[str] = "DB_POOL_MIN_SIZE"
+DB_POOL_MAX_SIZE_ENV_VAR: Final[str] = "DB_POOL_MAX_SIZE"
+DB_POOL_TIMEOUT_ENV_VAR: Final[str] = "DB_POOL_TIMEOUT_SECONDS"
+DB_POOL_MAX_IDLE_ENV_VAR: Final[str] = "DB_POOL_MAX_IDLE_SECONDS"
+DEFAULT_DB_POOL_MIN_SIZE: Final[int] = 1
+DEFAULT_DB_POOL_MAX_SIZE: Final[int] = 10
+DEFAULT_DB_POOL_TIMEOUT_SECONDS: Final[float] = 10.0
+DEFAULT_DB_POOL_MAX_IDLE_SECONDS: Final[float] = 300.0
+LLM_MAX_CONNECTIONS_ENV_VAR: Final[str] = "LLM_MAX_CONNECTIONS"
+LLM_MAX_KEEPALIVE_CONNECTIONS_ENV_VAR: Final[str] = "LLM_MAX_KEEPALIVE_CONNECTIONS"
+LLM_KEEPALIVE_EXPIRY_ENV_VAR: Final[str] = "LLM_KEEPALIVE_EXPIRY_SECONDS"
+LLM_CONNECT_TIMEOUT_ENV_VAR: Final[str] = "LLM_CONNECT_TIMEOUT_SECONDS"
+DEFAULT_LLM_MAX_CONNECTIONS: Final[int] = 100
+DEFAULT_LLM_MAX_KEEPALIVE_CONNECTIONS: Final[int] = 20
+DEFAULT_LLM_KEEPALIVE_EXPIRY_SECONDS: Final[float] = 60.0
+DEFAULT_LLM_CONNECT_TIMEOUT_SECONDS: Final[float] = 10.0
+LAPA_TIMEOUT_ENV_VAR: Final[str] = "LAPA_TIMEOUT_SECONDS"
+LAPA_MAX_RETRIES_ENV_VAR: Final[str] = "LAPA_MAX_RETRIES"
+OPENAI_TIMEOUT_ENV_VAR: Final[str] = "OPENAI_TIMEOUT_SECONDS"
+OPENAI_MAX_RETRIES_ENV_VAR: Final[str] = "OPENAI_MAX_RETRIES"
+DEFAULT_LAPA_TIMEOUT_SECONDS: Final[float] = 60.0
+DEFAULT_LAPA_MAX_RETRIES: Final[int] = 2
+DEFAULT_OPENAI_TIMEOUT_SECONDS: Final[float] = 300.0
+DEFAULT_OPENAI_MAX_RETRIES: Final[int] = 2
+WORKBOOK_CACHE_MAX_ENTRIES_ENV_VAR: Final[str] = "WORKBOOK_CACHE_MAX_ENTRIES"
+WORKBOOK_CACHE_TTL_ENV_VAR: Final[str] = "WORKBOOK_CACHE_TTL_SECONDS"
+WORKBOOK_CACHE_POSTGRES_ENV_VAR: Final[str] = "WORKBOOK_CACHE_POSTGRES"
+DEFAULT_WORKBOOK_CACHE_MAX_ENTRIES: Final[int] = 256
+DEFAULT_WORKBOOK_CACHE_TTL_SECONDS: Final[float] = 7 * 24 * 60 * 60
+WORKBOOK_CACHE_TABLE_NAME: Final[str] = "workbook_cache"
+STUDENT_DATA_DIR_ENV_VAR: Final[str] = "STUDENT_DATA_DIR"
+STUDENT_DATA_CHECK_ENV_VAR: Final[str] = "STUDENT_DATA_CHECK_SECONDS"
+DEFAULT_STUDENT_DATA_DIR: Final[Path] = PROJECT_ROOT / "data"
+DEFAULT_STUDENT_DATA_CHECK_SECONDS: Final[int] = 30
+STUDENT_DATA_COMPACT_ENV_VAR: Final[str] = "STUDENT_DATA_COMPACT"
+STUDENT_DATA_CACHE_MAX_AGE_ENV_VAR: Final[str] = "STUDENT_DATA_CACHE_MAX_AGE"
+DEFAULT_STUDENT_DATA_CACHE_MAX_AGE: Final[int] = 0
+STUDENT_DATA_BACKEND_ENV_VAR: Final[str] = "STUDENT_DATA_BACKEND"
+DEFAULT_STUDENT_DATA_BACKEND: Final[str] = "memory"
+STUDENT_DATA_SHARED_ENV_VAR: Final[str] = "STUDENT_DATA_SHARED"
+STUDENT_DATA_SHARED_DIR_ENV_VAR: Final[str] = "STUDENT_DATA_SHARED_DIR"
+DEFAULT_STUDENT_DATA_SHARED_DIR: Final[Path] = Path(tempfile.gettempdir()) / "mriynyk-student-data"
+ANSWER_JOB_WORKERS_ENV_VAR: Final[str] = "ANSWER_JOB_WORKERS"
+ANSWER_JOB_QUEUE_SIZE_ENV_VAR: Final[str] = "ANSWER_JOB_QUEUE_SIZE"
+ANSWER_JOB_TIMEOUT_ENV_VAR: Final[str] = "ANSWER_JOB_TIMEOUT_SECONDS"
+ANSWER_JOB_RETENTION_ENV_VAR: Final[str] = "ANSWER_JOB_RETENTION_SECONDS"
+DEFAULT_ANSWER_JOB_WORKERS: Final[int] = 4
+DEFAULT_ANSWER_JOB_QUEUE_SIZE: Final[int] = 100
+DEFAULT_ANSWER_JOB_TIMEOUT_SECONDS: Final[float] = 600.0
+DEFAULT_ANSWER_JOB_RETENTION_SECONDS: Final[float] = 24 * 60 * 60
+ANSWER_JOB_TABLE_NAME: Final[str] = "answer_jobs"
+TRUE_ENV_VALUES: Final[frozenset[str]] = frozenset({"1", "true", "yes", "on"})
+
+
+@dataclass(frozen=True)
+class PoolSettings:
+    min_size: int
+    max_size: int
+    timeout_seconds: float
+    max_idle_seconds: float
+
+
+@dataclass(frozen=True)
+class WorkbookCacheSettings:
+    max_entries: int
+    ttl_seconds: float
+    postgres_enabled: bool
+
+
+@dataclass(frozen=True)
+class AnswerJobSettings:
+    workers: int
+    queue_size: int
+    timeout_seconds: float
+    retention_seconds: float
+
+
+@dataclass(frozen=True)
+class VectorSearchSettings:
+    limit: int
+    ef_search: int
+
+
+@dataclass(frozen=True)
+class TopicMatchSettings:
+    min_score: float
+    min_margin: float
+    min_similarity: float
+    min_similarity_margin: float
+    embeddings_enabled: bool
+
+
+@dataclass(frozen=True)
+class HttpPoolSettings:
+    max_connections: int
+    max_keepalive_connections: int
+    keepalive_expiry_seconds: float
+    connect_timeout_seconds: float
+
+
+@dataclass(frozen=True)
+class ProviderSettings:
+    base_url: str | None
+    timeout_seconds: float
+    max_retries: int
 
 
 def load_environment() -> None:
@@ -34,6 +166,13 @@ def resolve_api_key() -> str:
     )
 
 
+def resolve_openai_api_key() -> str:
+    env_value = os.environ.get(OPENAI_API_KEY_ENV_VAR)
+    if env_value:
+        return env_value
+    raise ValueError(f"{OPENAI_API_KEY_ENV_VAR} missing in environment.")
+
+
 def resolve_database_url(database_url: str | None) -> str:
     if database_url:
         return database_url
@@ -44,3 +183,219 @@ def resolve_database_url(database_url: str | None) -> str:
     raise ValueError(
         "Database URL missing. Set DATABASE_URL/PG_DSN/POSTGRES_URL."
     )
+
+
+def resolve_positive_int(env_name: str, default: int) -> int:
+    raw_value = os.environ.get(env_name)
+    if raw_value is None:
+        return default
+    try:
+        value = int(raw_value)
+    except ValueError as exc:
+        raise ValueError(f"{env_name} must be a positive integer.") from exc
+    if value <= 0:
+        raise ValueError(f"{env_name} must be a positive integer.")
+    return value
+
+
+def resolve_non_negative_int(env_name: str, default: int) -> int:
+    raw_value = os.environ.get(env_name)
+    if raw_value is None:
+        return default
+    try:
+        value = int(raw_value)
+    except ValueError as exc:
+        raise ValueError(f"{env_name} must be a non-negative integer.") from exc
+    if value < 0:
+        raise ValueError(f"{env_name} must be a non-negative integer.")
+    return value
+
+
+def resolve_positive_float(env_name: str, default: float) -> float:
+    raw_value = os.environ.get(env_name)
+    if raw_value is None:
+        return default
+    try:
+        value = float(raw_value)
+    except ValueError as exc:
+        raise ValueError(f"{env_name} must be a positive number.") from exc
+    if value <= 0:
+        raise ValueError(f"{env_name} must be a positive number.")
+    return value
+
+
+def resolve_non_negative_float(env_name: str, default: float) -> float:
+    raw_value = os.environ.get(env_name)
+    if raw_value is None:
+        return default
+    try:
+        value = float(raw_value)
+    except ValueError as exc:
+        raise ValueError(f"{env_name} must be a non-negative number.") from exc
+    if value < 0:
+        raise ValueError(f"{env_name} must be a non-negative number.")
+    return value
+
+
+def resolve_flag(env_name: str, default: bool) -> bool:
+    raw_value = os.environ.get(env_name)
+    if raw_value is None:
+        return default
+    return raw_value.strip().lower() in TRUE_ENV_VALUES
+
+
+def resolve_pool_settings() -> PoolSettings:
+    min_size = resolve_positive_int(DB_POOL_MIN_SIZE_ENV_VAR, DEFAULT_DB_POOL_MIN_SIZE)
+    max_size = resolve_positive_int(DB_POOL_MAX_SIZE_ENV_VAR, DEFAULT_DB_POOL_MAX_SIZE)
+    if max_size < min_size:
+        raise ValueError(
+            f"{DB_POOL_MAX_SIZE_ENV_VAR} must not be lower than {DB_POOL_MIN_SIZE_ENV_VAR}."
+        )
+    return PoolSettings(
+        min_size=min_size,
+        max_size=max_size,
+        timeout_seconds=resolve_positive_float(
+            DB_POOL_TIMEOUT_ENV_VAR, DEFAULT_DB_POOL_TIMEOUT_SECONDS
+        ),
+        max_idle_seconds=resolve_positive_float(
+            DB_POOL_MAX_IDLE_ENV_VAR, DEFAULT_DB_POOL_MAX_IDLE_SECONDS
+        ),
+    )
+
+
+def resolve_http_pool_settings() -> HttpPoolSettings:
+    return HttpPoolSettings(
+        max_connections=resolve_positive_int(
+            LLM_MAX_CONNECTIONS_ENV_VAR, DEFAULT_LLM_MAX_CONNECTIONS
+        ),
+        max_keepalive_connections=resolve_positive_int(
+            LLM_MAX_KEEPALIVE_CONNECTIONS_ENV_VAR, DEFAULT_LLM_MAX_KEEPALIVE_CONNECTIONS
+        ),
+        keepalive_expiry_seconds=resolve_positive_float(
+            LLM_KEEPALIVE_EXPIRY_ENV_VAR, DEFAULT_LLM_KEEPALIVE_EXPIRY_SECONDS
+        ),
+        connect_timeout_seconds=resolve_positive_float(
+            LLM_CONNECT_TIMEOUT_ENV_VAR, DEFAULT_LLM_CONNECT_TIMEOUT_SECONDS
+        ),
+    )
+
+
+def resolve_lapa_settings() -> ProviderSettings:
+    return ProviderSettings(
+        base_url=LAPA_PROVIDER_BASE_URL,
+        timeout_seconds=resolve_positive_float(
+            LAPA_TIMEOUT_ENV_VAR, DEFAULT_LAPA_TIMEOUT_SECONDS
+        ),
+        max_retries=resolve_non_negative_int(
+            LAPA_MAX_RETRIES_ENV_VAR, DEFAULT_LAPA_MAX_RETRIES
+        ),
+    )
+
+
+def resolve_openai_settings() -> ProviderSettings:
+    return ProviderSettings(
+        base_url=None,
+        timeout_seconds=resolve_positive_float(
+            OPENAI_TIMEOUT_ENV_VAR, DEFAULT_OPENAI_TIMEOUT_SECONDS
+        ),
+        max_retries=resolve_non_negative_int(
+            OPENAI_MAX_RETRIES_ENV_VAR, DEFAULT_OPENAI_MAX_RETRIES
+        ),
+    )
+
+
+def resolve_workbook_cache_settings() -> WorkbookCacheSettings:
+    return WorkbookCacheSettings(
+        max_entries=resolve_positive_int(
+            WORKBOOK_CACHE_MAX_ENTRIES_ENV_VAR, DEFAULT_WORKBOOK_CACHE_MAX_ENTRIES
+        ),
+        ttl_seconds=resolve_positive_float(
+            WORKBOOK_CACHE_TTL_ENV_VAR, DEFAULT_WORKBOOK_CACHE_TTL_SECONDS
+        ),
+        postgres_enabled=resolve_flag(WORKBOOK_CACHE_POSTGRES_ENV_VAR, False),
+    )
+
+
+def resolve_answer_job_settings() -> AnswerJobSettings:
+    return AnswerJobSettings(
+        workers=resolve_positive_int(ANSWER_JOB_WORKERS_ENV_VAR, DEFAULT_ANSWER_JOB_WORKERS),
+        queue_size=resolve_positive_int(
+            ANSWER_JOB_QUEUE_SIZE_ENV_VAR, DEFAULT_ANSWER_JOB_QUEUE_SIZE
+        ),
+        timeout_seconds=resolve_positive_float(
+            ANSWER_JOB_TIMEOUT_ENV_VAR, DEFAULT_ANSWER_JOB_TIMEOUT_SECONDS
+        ),
+        retention_seconds=resolve_positive_float(
+            ANSWER_JOB_RETENTION_ENV_VAR, DEFAULT_ANSWER_JOB_RETENTION_SECONDS
+        ),
+    )
+
+
+def resolve_embedding_model() -> str:
+    return os.environ.get(EMBEDDING_MODEL_ENV_VAR) or DEFAULT_EMBEDDING_MODEL
+
+
+def resolve_topic_match_settings() -> TopicMatchSettings:
+    return TopicMatchSettings(
+        min_score=resolve_positive_float(
+            TOPIC_MATCH_MIN_SCORE_ENV_VAR, DEFAULT_TOPIC_MATCH_MIN_SCORE
+        ),
+        min_margin=resolve_non_negative_float(
+            TOPIC_MATCH_MIN_MARGIN_ENV_VAR, DEFAULT_TOPIC_MATCH_MIN_MARGIN
+        ),
+        min_similarity=resolve_positive_float(
+            TOPIC_MATCH_MIN_SIMILARITY_ENV_VAR, DEFAULT_TOPIC_MATCH_MIN_SIMILARITY
+        ),
+        min_similarity_margin=resolve_non_negative_float(
+            TOPIC_MATCH_MIN_SIMILARITY_MARGIN_ENV_VAR, DEFAULT_TOPIC_MATCH_MIN_SIMILARITY_MARGIN
+        ),
+        embeddings_enabled=resolve_flag(TOPIC_MATCH_EMBEDDINGS_ENV_VAR, False),
+    )
+
+
+def resolve_vector_search_settings() -> VectorSearchSettings:
+    return VectorSearchSettings(
+        limit=resolve_positive_int(VECTOR_SEARCH_LIMIT_ENV_VAR, DEFAULT_VECTOR_SEARCH_LIMIT),
+        ef_search=resolve_positive_int(HNSW_EF_SEARCH_ENV_VAR, DEFAULT_HNSW_EF_SEARCH),
+    )
+
+
+def resolve_context_token_budget() -> int:
+    return resolve_positive_int(CONTEXT_TOKEN_BUDGET_ENV_VAR, DEFAULT_CONTEXT_TOKEN_BUDGET)
+
+
+def resolve_prompt_bytecode_cache_dir() -> Path | None:
+    env_value = os.environ.get(PROMPT_BYTECODE_CACHE_ENV_VAR)
+    return Path(env_value) if env_value else None
+
+
+def resolve_student_data_dir() -> Path:
+    env_value = os.environ.get(STUDENT_DATA_DIR_ENV_VAR)
+    return Path(env_value) if env_value else DEFAULT_STUDENT_DATA_DIR
+
+
+def resolve_student_data_check_seconds() -> int:
+    return resolve_non_negative_int(
+        STUDENT_DATA_CHECK_ENV_VAR, DEFAULT_STUDENT_DATA_CHECK_SECONDS
+    )
+
+
+def resolve_student_data_compact() -> bool:
+    return resolve_flag(STUDENT_DATA_COMPACT_ENV_VAR, True)
+
+
+def resolve_student_data_shared_dir() -> Path | None:
+    if not resolve_flag(STUDENT_DATA_SHARED_ENV_VAR, True):
+        return None
+    env_value = os.environ.get(STUDENT_DATA_SHARED_DIR_ENV_VAR)
+    return Path(env_value) if env_value else DEFAULT_STUDENT_DATA_SHARED_DIR
+
+
+def resolve_student_data_backend() -> str:
+    return os.environ.get(STUDENT_DATA_BACKEND_ENV_VAR, DEFAULT_STUDENT_DATA_BACKEND)
+
+
+def resolve_student_data_cache_max_age() -> int:
+    return resolve_non_negative_int(
+        STUDENT_DATA_CACHE_MAX_AGE_ENV_VAR, DEFAULT_STUDENT_DATA_CACHE_MAX_AGE
+    )
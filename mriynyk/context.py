@@ -0,0 +1,135 @@
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import List, Sequence
+
+from mriynyk.models import Page
+from mriynyk.topic_matcher import normalize_text, stem_tokens, token_stems
+
+TOKEN_PIECE_PATTERN = re.compile(r"\w+|[^\w\s]")
+CHARS_PER_TOKEN = 4
+EXERCISE_WEIGHT = 0.5
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+@dataclass(frozen=True)
+class ContextUnit:
+    page_index: int
+    exercise_index: int | None
+    text: str
+    tokens: int
+
+
+@dataclass(frozen=True)
+class ContextUsage:
+    token_budget: int
+    tokens_used: int
+    tokens_available: int
+    pages_used: int
+    pages_total: int
+    exercises_used: int
+    exercises_total: int
+
+
+@dataclass(frozen=True)
+class AssembledContext:
+    chapter_text: str
+    usage: ContextUsage
+
+
+def estimate_tokens(text: str) -> int:
+    # BPE vocabularies split long (especially Cyrillic) words into ~4-character pieces.
+    return sum(
+        math.ceil(len(piece) / CHARS_PER_TOKEN) for piece in TOKEN_PIECE_PATTERN.findall(text)
+    )
+
+
+def build_units(pages: Sequence[Page]) -> List[ContextUnit]:
+    units: List[ContextUnit] = []
+    for page_index, page in enumerate(pages):
+        units.append(ContextUnit(page_index, None, page.text, estimate_tokens(page.text)))
+        for exercise_index, exercise in enumerate(page.exercies):
+            units.append(
+                ContextUnit(page_index, exercise_index, exercise, estimate_tokens(exercise))
+            )
+    return units
+
+
+def score_units(units: Sequence[ContextUnit], query: str) -> List[float]:
+    query_stems = token_stems(normalize_text(query))
+    unit_terms = [Counter(stem_tokens(normalize_text(unit.text))) for unit in units]
+    average_length = sum(sum(terms.values()) for terms in unit_terms) / max(len(units), 1)
+    document_frequency = Counter(
+        stem for terms in unit_terms for stem in terms if stem in query_stems
+    )
+    scores: List[float] = []
+    for unit, terms in zip(units, unit_terms):
+        length = sum(terms.values())
+        score = 0.0
+        for stem in query_stems:
+            frequency = terms.get(stem, 0)
+            if not frequency:
+                continue
+            matching_units = document_frequency[stem]
+            idf = math.log(1 + (len(units) - matching_units + 0.5) / (matching_units + 0.5))
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * length / max(average_length, 1))
+            score += idf * frequency * (BM25_K1 + 1) / (frequency + norm)
+        if unit.exercise_index is not None:
+            score *= EXERCISE_WEIGHT
+        scores.append(score)
+    return scores
+
+
+def truncate_to_budget(text: str, token_budget: int) -> str:
+    pieces = TOKEN_PIECE_PATTERN.finditer(text)
+    used = 0
+    end = 0
+    for piece in pieces:
+        cost = math.ceil(len(piece.group()) / CHARS_PER_TOKEN)
+        if used + cost > token_budget:
+            break
+        used += cost
+        end = piece.end()
+    return text[:end]
+
+
+def assemble_context(pages: Sequence[Page], query: str, token_budget: int) -> AssembledContext:
+    units = build_units(pages)
+    scores = score_units(units, query)
+    # Ties keep book order, so an unrelated query still gets the chapter opening.
+    ranked = sorted(range(len(units)), key=lambda index: (-scores[index], index))
+
+    selected: dict[int, str] = {}
+    tokens_used = 0
+    for index in ranked:
+        unit = units[index]
+        remaining = token_budget - tokens_used
+        if unit.tokens <= remaining:
+            selected[index] = unit.text
+            tokens_used += unit.tokens
+        elif not selected and unit.exercise_index is None:
+            selected[index] = truncate_to_budget(unit.text, remaining)
+            tokens_used += estimate_tokens(selected[index])
+
+    blocks: List[str] = []
+    for index in sorted(selected):
+        unit = units[index]
+        if unit.exercise_index is None:
+            blocks.append(selected[index])
+        else:
+            blocks.append(f"Вправа: {selected[index]}")
+
+    return AssembledContext(
+        chapter_text="\n".join(blocks),
+        usage=ContextUsage(
+            token_budget=token_budget,
+            tokens_used=tokens_used,
+            tokens_available=sum(unit.tokens for unit in units),
+            pages_used=sum(1 for index in selected if units[index].exercise_index is None),
+            pages_total=len(pages),
+            exercises_used=sum(1 for index in selected if units[index].exercise_index is not None),
+            exercises_total=sum(len(page.exercies) for page in pages),
+        ),
+    )
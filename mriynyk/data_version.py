@@ -0,0 +1,114 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Generic, Sequence, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def file_version(paths: Sequence[Path]) -> str:
+    digest = hashlib.sha1()
+    for path in paths:
+        stat = os.stat(path)
+        digest.update(f"{path.name}:{stat.st_mtime_ns}:{stat.st_size};".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+class DataVersionManager(Generic[T]):
+    def __init__(
+        self,
+        name: str,
+        paths: Sequence[Path],
+        load: Callable[[str], T],
+        check_seconds: float,
+    ) -> None:
+        self._name = name
+        self._paths = tuple(paths)
+        self._load = load
+        self._check_seconds = check_seconds
+        self._current: tuple[str, T] | None = None
+        self._loaded_at: float | None = None
+        self._load_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._counters = {"reloads": 0, "reload_errors": 0}
+
+    def current(self) -> T:
+        current = self._current
+        if current is None:
+            with self._load_lock:
+                if self._current is None:
+                    self._swap(self._load_stable())
+                current = self._current
+        return current[1]
+
+    def loaded(self) -> T | None:
+        current = self._current
+        return current[1] if current is not None else None
+
+    @property
+    def version(self) -> str | None:
+        current = self._current
+        return current[0] if current is not None else None
+
+    def refresh(self) -> bool:
+        # Only reload what has been loaded; the first load stays lazy.
+        if self._current is None or file_version(self._paths) == self._current[0]:
+            return False
+        with self._load_lock:
+            if file_version(self._paths) == self._current[0]:
+                return False
+            loaded = self._load_stable()
+            self._swap(loaded)
+        self._counters["reloads"] += 1
+        logger.info("Reloaded %s data, version %s", self._name, loaded[0])
+        return True
+
+    def start(self) -> None:
+        if self._check_seconds <= 0 or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._watch, name=f"{self._name}-data-watcher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self._check_seconds)
+            self._thread = None
+
+    def stats(self) -> dict[str, object]:
+        return {
+            "version": self.version,
+            "loaded_at": self._loaded_at,
+            "check_seconds": self._check_seconds,
+            "watching": self._thread is not None,
+            **self._counters,
+        }
+
+    def _load_stable(self) -> tuple[str, T]:
+        version = file_version(self._paths)
+        value = self._load(version)
+        # An export still being written shows up as a changed stamp; keep the old data.
+        if file_version(self._paths) != version:
+            raise RuntimeError(f"{self._name} data changed while loading")
+        return version, value
+
+    def _swap(self, loaded: tuple[str, T]) -> None:
+        self._current = loaded
+        self._loaded_at = time.time()
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self._check_seconds):
+            try:
+                self.refresh()
+            except Exception:
+                self._counters["reload_errors"] += 1
+                logger.warning("Reloading %s data failed", self._name, exc_info=True)
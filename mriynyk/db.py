@@ -0,0 +1,46 @@
+import asyncio
+
+from psycopg_pool import AsyncConnectionPool
+
+from mriynyk.config import resolve_pool_settings
+
+_POOLS: dict[str, AsyncConnectionPool] = {}
+_POOLS_LOCK = asyncio.Lock()
+
+
+async def get_connection_pool(database_url: str) -> AsyncConnectionPool:
+    pool = _POOLS.get(database_url)
+    if pool is not None:
+        return pool
+    async with _POOLS_LOCK:
+        pool = _POOLS.get(database_url)
+        if pool is None:
+            settings = resolve_pool_settings()
+            pool = AsyncConnectionPool(
+                conninfo=database_url,
+                min_size=settings.min_size,
+                max_size=settings.max_size,
+                timeout=settings.timeout_seconds,
+                max_idle=settings.max_idle_seconds,
+                check=AsyncConnectionPool.check_connection,
+                name=f"mriynyk-{len(_POOLS)}",
+                open=False,
+            )
+            await pool.open()
+            _POOLS[database_url] = pool
+    return pool
+
+
+def pool_stats() -> dict[str, int]:
+    stats: dict[str, int] = {}
+    for pool in list(_POOLS.values()):
+        for name, value in pool.get_stats().items():
+            stats[name] = stats.get(name, 0) + value
+    return stats
+
+
+async def close_connection_pools() -> None:
+    async with _POOLS_LOCK:
+        for pool in _POOLS.values():
+            await pool.close()
+        _POOLS.clear()
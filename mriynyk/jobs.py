@@ -0,0 +1,332 @@
+import asyncio
+import logging
+import time
+import uuid
+from collections import Counter, OrderedDict
+from contextlib import suppress
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Awaitable, Callable
+
+from psycopg import AsyncConnection, sql
+from psycopg.types.json import Jsonb
+
+from mriynyk.config import (
+    ANSWER_JOB_TABLE_NAME,
+    DEFAULT_SCHEMA_NAME,
+    AnswerJobSettings,
+    resolve_answer_job_settings,
+    resolve_database_url,
+)
+from mriynyk.db import get_connection_pool
+from mriynyk.metrics import get_metrics
+from mriynyk.models import AnswerJob, JobStatus, TopicRequest, TopicResponse
+from mriynyk.service import answer_request
+
+logger = logging.getLogger(__name__)
+
+MAX_JOB_WAIT_SECONDS = 60.0
+JOB_POLL_INTERVAL_SECONDS = 1.0
+MAX_FINISHED_JOBS = 1024
+FINISHED_STATUSES = frozenset({JobStatus.succeeded, JobStatus.failed})
+
+CREATE_TABLE_SQL = sql.SQL(
+    "CREATE TABLE IF NOT EXISTS {}.{} ("
+    "job_id text PRIMARY KEY, "
+    "status text NOT NULL, "
+    "request jsonb NOT NULL, "
+    "result jsonb, "
+    "error text, "
+    "created_at timestamptz NOT NULL, "
+    "started_at timestamptz, "
+    "finished_at timestamptz)"
+).format(sql.Identifier(DEFAULT_SCHEMA_NAME), sql.Identifier(ANSWER_JOB_TABLE_NAME))
+
+INSERT_SQL = sql.SQL(
+    "INSERT INTO {}.{} (job_id, status, request, created_at) VALUES (%s, %s, %s, %s)"
+).format(sql.Identifier(DEFAULT_SCHEMA_NAME), sql.Identifier(ANSWER_JOB_TABLE_NAME))
+
+UPDATE_SQL = sql.SQL(
+    "UPDATE {}.{} SET status = %s, result = %s, error = %s, started_at = %s, finished_at = %s "
+    "WHERE job_id = %s"
+).format(sql.Identifier(DEFAULT_SCHEMA_NAME), sql.Identifier(ANSWER_JOB_TABLE_NAME))
+
+SELECT_SQL = sql.SQL(
+    "SELECT status, result, error, created_at, started_at, finished_at FROM {}.{} "
+    "WHERE job_id = %s"
+).format(sql.Identifier(DEFAULT_SCHEMA_NAME), sql.Identifier(ANSWER_JOB_TABLE_NAME))
+
+DELETE_EXPIRED_SQL = sql.SQL(
+    "DELETE FROM {}.{} WHERE finished_at < now() - make_interval(secs => %s)"
+).format(sql.Identifier(DEFAULT_SCHEMA_NAME), sql.Identifier(ANSWER_JOB_TABLE_NAME))
+
+# A running job older than the job timeout, or a queued one older than the retention
+# period, belonged to a worker that has since exited.
+FAIL_ABANDONED_SQL = sql.SQL(
+    "UPDATE {}.{} SET status = 'failed', error = 'Interrupted by a restart.', "
+    "finished_at = now() WHERE finished_at IS NULL AND ("
+    "started_at < now() - make_interval(secs => %s) OR "
+    "created_at < now() - make_interval(secs => %s))"
+).format(sql.Identifier(DEFAULT_SCHEMA_NAME), sql.Identifier(ANSWER_JOB_TABLE_NAME))
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+@dataclass
+class _JobEntry:
+    job: AnswerJob
+    request: TopicRequest
+    done: asyncio.Event = field(default_factory=asyncio.Event)
+    write: asyncio.Task | None = None
+
+
+def utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class AnswerJobQueue:
+    def __init__(self, settings: AnswerJobSettings) -> None:
+        self._settings = settings
+        self._queue: asyncio.Queue[_JobEntry] | None = None
+        self._workers: list[asyncio.Task] = []
+        self._writes: set[asyncio.Task] = set()
+        self._jobs: OrderedDict[str, _JobEntry] = OrderedDict()
+        self._running = 0
+        self._table_ready = False
+        self._counters: Counter[str] = Counter()
+        metrics = get_metrics()
+        metrics.register_value(
+            "mriynyk_answer_jobs_queued", "gauge", "Answer jobs waiting for a worker.",
+            self.queued,
+        )
+        metrics.register_value(
+            "mriynyk_answer_jobs_running", "gauge", "Answer jobs being generated.",
+            lambda: self._running,
+        )
+        for name in ("submitted", "succeeded", "failed", "rejected"):
+            metrics.register_value(
+                f"mriynyk_answer_jobs_{name}_total", "counter", f"Answer jobs {name}.",
+                lambda name=name: self._counters[name],
+            )
+
+    def queued(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def start(self) -> None:
+        self._queue = asyncio.Queue(maxsize=self._settings.queue_size)
+        self._workers = [
+            asyncio.create_task(self._work(self._queue), name=f"answer-job-{index}")
+            for index in range(self._settings.workers)
+        ]
+
+    async def clean_up_table(self) -> None:
+        pool = await get_connection_pool(resolve_database_url(None))
+        async with pool.connection() as connection:
+            await self._ensure_table(connection)
+            await connection.execute(
+                FAIL_ABANDONED_SQL,
+                (self._settings.timeout_seconds, self._settings.retention_seconds),
+            )
+            await connection.execute(DELETE_EXPIRED_SQL, (self._settings.retention_seconds,))
+
+    async def stop(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        # Fail what is left so that pollers on other workers stop waiting for it.
+        for entry in self._jobs.values():
+            if entry.job.finished_at is not None:
+                continue
+            entry.job.status = JobStatus.failed
+            entry.job.error = "Interrupted by shutdown."
+            entry.job.finished_at = utc_now()
+            self._counters["failed"] += 1
+            entry.done.set()
+            self._persist(entry, lambda job=entry.job: self._update(job))
+        await asyncio.gather(*self._writes, return_exceptions=True)
+
+    def submit(self, request: TopicRequest) -> AnswerJob:
+        if self._queue is None or self._queue.full():
+            self._counters["rejected"] += 1
+            raise JobQueueFull("Answer job queue is full.")
+        entry = _JobEntry(
+            job=AnswerJob(job_id=uuid.uuid4().hex, status=JobStatus.queued, created_at=utc_now()),
+            request=request,
+        )
+        self._queue.put_nowait(entry)
+        self._jobs[entry.job.job_id] = entry
+        self._prune()
+        self._persist(entry, lambda: self._insert(entry))
+        self._counters["submitted"] += 1
+        return entry.job.model_copy()
+
+    async def get(self, job_id: str, wait_seconds: float = 0.0) -> AnswerJob | None:
+        entry = self._jobs.get(job_id)
+        if entry is not None:
+            if wait_seconds > 0:
+                with suppress(TimeoutError):
+                    await asyncio.wait_for(entry.done.wait(), wait_seconds)
+            return entry.job.model_copy()
+        # Submitted to another worker process: long-polling falls back to the table.
+        deadline = time.monotonic() + wait_seconds
+        while True:
+            job = await self._load(job_id)
+            remaining = deadline - time.monotonic()
+            if job is None or job.status in FINISHED_STATUSES or remaining <= 0:
+                return job
+            await asyncio.sleep(min(JOB_POLL_INTERVAL_SECONDS, remaining))
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "queued": self.queued(),
+            "running": self._running,
+            "workers": len(self._workers),
+            "queue_size": self._settings.queue_size,
+            "jobs": len(self._jobs),
+            "submitted": self._counters["submitted"],
+            "succeeded": self._counters["succeeded"],
+            "failed": self._counters["failed"],
+            "rejected": self._counters["rejected"],
+            "postgres_errors": self._counters["postgres_errors"],
+            "pending_writes": len(self._writes),
+        }
+
+    async def _work(self, queue: asyncio.Queue[_JobEntry]) -> None:
+        while True:
+            entry = await queue.get()
+            try:
+                await self._run(entry)
+            finally:
+                queue.task_done()
+
+    async def _run(self, entry: _JobEntry) -> None:
+        job = entry.job
+        job.status = JobStatus.running
+        job.started_at = utc_now()
+        self._running += 1
+        self._persist(entry, lambda: self._update(job))
+        try:
+            job.result = await asyncio.wait_for(
+                answer_request(entry.request), self._settings.timeout_seconds
+            )
+        except TimeoutError:
+            job.status = JobStatus.failed
+            job.error = f"Timed out after {self._settings.timeout_seconds:.0f}s."
+        except Exception as exc:
+            logger.exception("Answer job %s failed", job.job_id)
+            job.status = JobStatus.failed
+            job.error = f"{type(exc).__name__}: {exc}"
+        else:
+            job.status = JobStatus.succeeded
+        finally:
+            self._running -= 1
+        job.finished_at = utc_now()
+        self._counters[job.status.value] += 1
+        entry.done.set()
+        self._persist(entry, lambda: self._update(job))
+
+    def _persist(self, entry: _JobEntry, write: Callable[[], Awaitable[None]]) -> None:
+        # The table only serves polls on other workers, so neither the request nor the
+        # generation waits for it. Writes for one job are chained to keep them in order.
+        previous = entry.write
+
+        async def run() -> None:
+            if previous is not None:
+                await asyncio.wait([previous])
+            await write()
+
+        task = asyncio.create_task(run())
+        entry.write = task
+        self._writes.add(task)
+        task.add_done_callback(self._writes.discard)
+
+    def _prune(self) -> None:
+        cutoff = utc_now().timestamp() - self._settings.retention_seconds
+        finished = [
+            job_id for job_id, entry in self._jobs.items() if entry.job.finished_at is not None
+        ]
+        excess = len(finished) - MAX_FINISHED_JOBS
+        for job_id in finished:
+            if excess > 0 or self._jobs[job_id].job.finished_at.timestamp() < cutoff:
+                del self._jobs[job_id]
+                excess -= 1
+
+    async def _ensure_table(self, connection: AsyncConnection) -> None:
+        if self._table_ready:
+            return
+        await connection.execute(CREATE_TABLE_SQL)
+        self._table_ready = True
+
+    async def _insert(self, entry: _JobEntry) -> None:
+        job = entry.job
+        try:
+            pool = await get_connection_pool(resolve_database_url(None))
+            async with pool.connection() as connection:
+                await self._ensure_table(connection)
+                await connection.execute(
+                    INSERT_SQL,
+                    (
+                        job.job_id,
+                        job.status.value,
+                        Jsonb(entry.request.model_dump(mode="json")),
+                        job.created_at,
+                    ),
+                    prepare=True,
+                )
+        except Exception:
+            logger.warning("Storing answer job %s in Postgres failed", job.job_id, exc_info=True)
+            self._counters["postgres_errors"] += 1
+
+    async def _update(self, job: AnswerJob) -> None:
+        try:
+            pool = await get_connection_pool(resolve_database_url(None))
+            async with pool.connection() as connection:
+                await self._ensure_table(connection)
+                await connection.execute(
+                    UPDATE_SQL,
+                    (
+                        job.status.value,
+                        Jsonb(job.result.model_dump()) if job.result is not None else None,
+                        job.error,
+                        job.started_at,
+                        job.finished_at,
+                        job.job_id,
+                    ),
+                    prepare=True,
+                )
+        except Exception:
+            logger.warning("Updating answer job %s in Postgres failed", job.job_id, exc_info=True)
+            self._counters["postgres_errors"] += 1
+
+    async def _load(self, job_id: str) -> AnswerJob | None:
+        try:
+            pool = await get_connection_pool(resolve_database_url(None))
+            async with pool.connection() as connection:
+                await self._ensure_table(connection)
+                cursor = await connection.execute(SELECT_SQL, (job_id,), prepare=True)
+                row = await cursor.fetchone()
+        except Exception:
+            logger.warning("Answer job lookup in Postgres failed", exc_info=True)
+            self._counters["postgres_errors"] += 1
+            return None
+        if row is None:
+            return None
+        status, result, error, created_at, started_at, finished_at = row
+        return AnswerJob(
+            job_id=job_id,
+            status=JobStatus(status),
+            result=TopicResponse.model_validate(result) if result is not None else None,
+            error=error,
+            created_at=created_at,
+            started_at=started_at,
+            finished_at=finished_at,
+        )
+
+
+@lru_cache(maxsize=1)
+def get_answer_jobs() -> AnswerJobQueue:
+    return AnswerJobQueue(resolve_answer_job_settings())
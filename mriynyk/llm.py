@@ -0,0 +1,91 @@
+from enum import StrEnum
+from threading import Lock
+from typing import Sequence
+
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+from mriynyk.config import (
+    ProviderSettings,
+    resolve_api_key,
+    resolve_embedding_model,
+    resolve_http_pool_settings,
+    resolve_lapa_settings,
+    resolve_openai_api_key,
+    resolve_openai_settings,
+)
+
+
+class LlmProvider(StrEnum):
+    lapa = "lapa"
+    openai = "openai"
+
+
+_ASYNC_CLIENTS: dict[LlmProvider, AsyncOpenAI] = {}
+_CLIENTS_LOCK = Lock()
+
+
+def resolve_provider_settings(provider: LlmProvider) -> ProviderSettings:
+    if provider is LlmProvider.lapa:
+        return resolve_lapa_settings()
+    return resolve_openai_settings()
+
+
+def resolve_provider_api_key(provider: LlmProvider) -> str:
+    if provider is LlmProvider.lapa:
+        return resolve_api_key()
+    return resolve_openai_api_key()
+
+
+def build_http_limits() -> httpx.Limits:
+    pool_settings = resolve_http_pool_settings()
+    return httpx.Limits(
+        max_connections=pool_settings.max_connections,
+        max_keepalive_connections=pool_settings.max_keepalive_connections,
+        keepalive_expiry=pool_settings.keepalive_expiry_seconds,
+    )
+
+
+def build_http_timeout(settings: ProviderSettings) -> httpx.Timeout:
+    pool_settings = resolve_http_pool_settings()
+    return httpx.Timeout(
+        settings.timeout_seconds,
+        connect=pool_settings.connect_timeout_seconds,
+    )
+
+
+def get_async_llm_client(provider: LlmProvider) -> AsyncOpenAI:
+    client = _ASYNC_CLIENTS.get(provider)
+    if client is not None:
+        return client
+    with _CLIENTS_LOCK:
+        client = _ASYNC_CLIENTS.get(provider)
+        if client is None:
+            settings = resolve_provider_settings(provider)
+            timeout = build_http_timeout(settings)
+            client = AsyncOpenAI(
+                api_key=resolve_provider_api_key(provider),
+                base_url=settings.base_url,
+                timeout=timeout,
+                max_retries=settings.max_retries,
+                http_client=DefaultAsyncHttpxClient(limits=build_http_limits(), timeout=timeout),
+            )
+            _ASYNC_CLIENTS[provider] = client
+    return client
+
+
+async def close_llm_clients() -> None:
+    with _CLIENTS_LOCK:
+        clients = list(_ASYNC_CLIENTS.values())
+        _ASYNC_CLIENTS.clear()
+    for client in clients:
+        await client.close()
+
+
+async def embed_texts(texts: Sequence[str]) -> list[list[float]]:
+    client = get_async_llm_client(LlmProvider.lapa)
+    response = await client.embeddings.create(
+        model=resolve_embedding_model(),
+        input=list(texts),
+    )
+    return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
@@ -0,0 +1,147 @@
+import bisect
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Callable, Iterator
+
+STAGE_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_REQUEST_TIMINGS: ContextVar[list[tuple[str, float]] | None] = ContextVar(
+    "request_timings", default=None
+)
+
+
+@dataclass
+class StageHistogram:
+    bucket_counts: list[int]
+    total_seconds: float = 0.0
+    count: int = 0
+
+
+@dataclass
+class Metrics:
+    buckets: tuple[float, ...] = STAGE_BUCKETS
+    histograms: dict[str, StageHistogram] = field(default_factory=dict)
+    errors: Counter[str] = field(default_factory=Counter)
+    tokens: Counter[tuple[str, str]] = field(default_factory=Counter)
+    values: dict[str, tuple[str, str, Callable[[], float]]] = field(default_factory=dict)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def observe(self, stage: str, seconds: float) -> None:
+        with self.lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = StageHistogram([0] * len(self.buckets))
+                self.histograms[stage] = histogram
+            index = bisect.bisect_left(self.buckets, seconds)
+            if index < len(self.buckets):
+                histogram.bucket_counts[index] += 1
+            histogram.total_seconds += seconds
+            histogram.count += 1
+
+    def count_error(self, stage: str) -> None:
+        with self.lock:
+            self.errors[stage] += 1
+
+    def count_tokens(self, stage: str, kind: str, count: int) -> None:
+        with self.lock:
+            self.tokens[(stage, kind)] += count
+
+    def register_value(
+        self, name: str, kind: str, help_text: str, read: Callable[[], float]
+    ) -> None:
+        with self.lock:
+            self.values[name] = (kind, help_text, read)
+
+    def render(self) -> str:
+        with self.lock:
+            lines = [
+                "# HELP mriynyk_stage_seconds Latency of each pipeline stage.",
+                "# TYPE mriynyk_stage_seconds histogram",
+            ]
+            for stage, histogram in sorted(self.histograms.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, histogram.bucket_counts):
+                    cumulative += bucket_count
+                    lines.append(
+                        f'mriynyk_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}'
+                    )
+                lines.append(
+                    f'mriynyk_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {histogram.count}'
+                )
+                lines.append(
+                    f'mriynyk_stage_seconds_sum{{stage="{stage}"}} {histogram.total_seconds}'
+                )
+                lines.append(f'mriynyk_stage_seconds_count{{stage="{stage}"}} {histogram.count}')
+            lines += [
+                "# HELP mriynyk_stage_errors_total Pipeline stages that raised.",
+                "# TYPE mriynyk_stage_errors_total counter",
+            ]
+            for stage, count in sorted(self.errors.items()):
+                lines.append(f'mriynyk_stage_errors_total{{stage="{stage}"}} {count}')
+            lines += [
+                "# HELP mriynyk_llm_tokens_total Tokens reported by LLM responses.",
+                "# TYPE mriynyk_llm_tokens_total counter",
+            ]
+            for (stage, kind), count in sorted(self.tokens.items()):
+                lines.append(f'mriynyk_llm_tokens_total{{stage="{stage}",kind="{kind}"}} {count}')
+            for name, (kind, help_text, read) in sorted(self.values.items()):
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}", f"{name} {read()}"]
+        return "\n".join(lines) + "\n"
+
+
+@lru_cache(maxsize=1)
+def get_metrics() -> Metrics:
+    return Metrics()
+
+
+@contextmanager
+def timed(stage: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        get_metrics().count_error(stage)
+        raise
+    finally:
+        seconds = time.perf_counter() - started
+        get_metrics().observe(stage, seconds)
+        timings = _REQUEST_TIMINGS.get()
+        if timings is not None:
+            timings.append((stage, seconds))
+
+
+def record_usage(stage: str, usage: Any) -> None:
+    if usage is None:
+        return
+    # Chat completions report prompt/completion tokens, the Responses API input/output.
+    input_tokens = getattr(usage, "input_tokens", None) or getattr(usage, "prompt_tokens", 0)
+    output_tokens = getattr(usage, "output_tokens", None) or getattr(usage, "completion_tokens", 0)
+    metrics = get_metrics()
+    metrics.count_tokens(stage, "input", input_tokens or 0)
+    metrics.count_tokens(stage, "output", output_tokens or 0)
+
+
+def start_request_timings() -> tuple[list[tuple[str, float]], Token]:
+    # The list is shared by reference, so stages run in worker threads still land in it.
+    timings: list[tuple[str, float]] = []
+    return timings, _REQUEST_TIMINGS.set(timings)
+
+
+def reset_request_timings(token: Token) -> None:
+    _REQUEST_TIMINGS.reset(token)
+
+
+def server_timing_header(timings: list[tuple[str, float]], total_seconds: float) -> str:
+    durations: dict[str, float] = {}
+    for stage, seconds in timings:
+        durations[stage] = durations.get(stage, 0.0) + seconds
+    durations["total"] = total_seconds
+    return ", ".join(
+        f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in durations.items()
+    )
@@ -1,6 +1,7 @@
 from enum import Enum, StrEnum
-from typing import List, TypeAlias
+from typing import Any, List, TypeAlias
 from dataclasses import dataclass
+from datetime import date, datetime
 
 from pydantic import AliasChoices, BaseModel, ConfigDict, Field
 
@@ -19,12 +20,28 @@ class Subject(StrEnum):
     algebra = "Алгебра"
 
 
+class RetrievalMode(StrEnum):
+    topic = "topic"
+    vector = "vector"
+
+
+class StudentDataBackend(StrEnum):
+    memory = "memory"
+    dataset = "dataset"
+
+
 @dataclass
 class Page:
     text: str
     exercies: List[str]
 
 
+@dataclass
+class StreamEvent:
+    event: str
+    data: dict[str, Any]
+
+
 class QuizQuestion(BaseModel):
     text: str
     options: List[str]
@@ -42,6 +59,7 @@ class TopicRequest(BaseModel):
     subject: Subject
     topic: str = Field(validation_alias=AliasChoices("question", "query"))
     student_info: str
+    retrieval: RetrievalMode = RetrievalMode.topic
 
 
 class TopicResponse(BaseModel):
@@ -49,6 +67,23 @@ class TopicResponse(BaseModel):
     quiz_questions: List[QuizQuestion] = Field(default_factory=list)
 
 
+class JobStatus(StrEnum):
+    queued = "queued"
+    running = "running"
+    succeeded = "succeeded"
+    failed = "failed"
+
+
+class AnswerJob(BaseModel):
+    job_id: str
+    status: JobStatus
+    result: TopicResponse | None = None
+    error: str | None = None
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+
+
 DisciplineName: TypeAlias = str
 
 
@@ -69,9 +104,40 @@ class ScoreItem(BaseModel):
     score: float | None
 
 
+class HistorySummary(BaseModel):
+    count: int
+    average: float | None = None
+
+
 class StudentDataResponse(BaseModel):
     absences: list[AbsenceItem]
     scores: list[ScoreItem]
+    absences_summary: HistorySummary
+    scores_summary: HistorySummary
+    absences_next: str | None = None
+    scores_next: str | None = None
+
+
+class StudentBatchRequest(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    student_ids: list[int] = Field(min_length=1, max_length=500)
+    grade: int | None = Field(default=None, ge=1, le=12)
+    subject: str | None = None
+    date_from: date | None = Field(default=None, alias="from")
+    date_to: date | None = Field(default=None, alias="to")
+
+
+class StudentBatchItem(BaseModel):
+    student_id: int
+    absences: list[AbsenceItem]
+    scores: list[ScoreItem]
+    absences_summary: HistorySummary
+    scores_summary: HistorySummary
+
+
+class StudentBatchResponse(BaseModel):
+    students: list[StudentBatchItem]
 
 
 class SubjectAverage(BaseModel):
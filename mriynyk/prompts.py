@@ -0,0 +1,113 @@
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Mapping
+
+from jinja2 import (
+    BytecodeCache,
+    Environment,
+    FileSystemBytecodeCache,
+    FileSystemLoader,
+    Template,
+)
+
+from mriynyk.config import PROMPTS_DIR, resolve_prompt_bytecode_cache_dir
+
+PROMPT_SUFFIX = ".j2"
+
+
+@dataclass
+class RenderStats:
+    count: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+    def record(self, elapsed_seconds: float) -> None:
+        self.count += 1
+        self.total_seconds += elapsed_seconds
+        self.max_seconds = max(self.max_seconds, elapsed_seconds)
+
+
+class PromptRegistry:
+    def __init__(self, bytecode_cache: BytecodeCache | None) -> None:
+        loader = FileSystemLoader(PROMPTS_DIR)
+        # auto_reload=False: templates are compiled once and never re-stat'ed per render.
+        self._environment = Environment(
+            loader=loader, auto_reload=False, bytecode_cache=bytecode_cache
+        )
+        self._async_environment = Environment(
+            loader=loader, auto_reload=False, bytecode_cache=bytecode_cache, enable_async=True
+        )
+        self._templates: dict[str, Template] = {}
+        self._async_templates: dict[str, Template] = {}
+        self._stats: dict[str, RenderStats] = {}
+
+    def compile_all(self) -> list[str]:
+        names = sorted(path.name for path in PROMPTS_DIR.glob(f"*{PROMPT_SUFFIX}"))
+        for name in names:
+            self._template(name)
+            self._async_template(name)
+        return names
+
+    def render(self, name: str, context: Mapping[str, Any]) -> str:
+        template = self._template(name)
+        started = time.perf_counter()
+        rendered = template.render(context)
+        self._record(name, time.perf_counter() - started)
+        return rendered
+
+    async def render_async(self, name: str, context: Mapping[str, Any]) -> str:
+        template = self._async_template(name)
+        started = time.perf_counter()
+        rendered = await template.render_async(context)
+        self._record(name, time.perf_counter() - started)
+        return rendered
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        return {
+            name: {
+                "count": stats.count,
+                "total_ms": round(stats.total_seconds * 1000, 3),
+                "max_ms": round(stats.max_seconds * 1000, 3),
+            }
+            for name, stats in self._stats.items()
+        }
+
+    def _template(self, name: str) -> Template:
+        template = self._templates.get(name)
+        if template is None:
+            template = self._environment.get_template(name)
+            self._templates[name] = template
+        return template
+
+    def _async_template(self, name: str) -> Template:
+        template = self._async_templates.get(name)
+        if template is None:
+            template = self._async_environment.get_template(name)
+            self._async_templates[name] = template
+        return template
+
+    def _record(self, name: str, elapsed_seconds: float) -> None:
+        self._stats.setdefault(name, RenderStats()).record(elapsed_seconds)
+
+
+@lru_cache(maxsize=1)
+def get_prompt_registry() -> PromptRegistry:
+    cache_dir = resolve_prompt_bytecode_cache_dir()
+    bytecode_cache = None
+    if cache_dir is not None:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        bytecode_cache = FileSystemBytecodeCache(str(cache_dir))
+    return PromptRegistry(bytecode_cache)
+
+
+def compile_prompts() -> list[str]:
+    return get_prompt_registry().compile_all()
+
+
+def render_prompt(name: str, context: Mapping[str, Any]) -> str:
+    return get_prompt_registry().render(name, context)
+
+
+async def render_prompt_async(name: str, context: Mapping[str, Any]) -> str:
+    return await get_prompt_registry().render_async(name, context)
@@ -1,10 +1,15 @@
+import ast
+import hashlib
+import json
 import logging
-from typing import List, Optional, Sequence
+import re
+from collections import Counter
+from dataclasses import asdict
+from functools import lru_cache
+from typing import AsyncIterator, List, Optional, Sequence
 
-import psycopg
+from jiter import from_json
 from psycopg import sql
-from openai import OpenAI
-from jinja2 import Environment, FileSystemLoader
 
 from mriynyk.config import (
     DEFAULT_DISCIPLINE_COLUMN,
@@ -12,14 +17,84 @@ from mriynyk.config import (
     DEFAULT_PAGE_TEXT_COLUMN,
     DEFAULT_SCHEMA_NAME,
     DEFAULT_TABLE_NAME,
-    LAPA_PROVIDER_BASE_URL,
-    resolve_api_key,
+    DEFAULT_VECTOR_COLUMN,
+    resolve_context_token_budget,
     resolve_database_url,
+    resolve_vector_search_settings,
 )
-from mriynyk.models import DisciplineName, Page, Subject, TopicRequest, TopicResponse, Workbook, Year
+from mriynyk.context import AssembledContext, assemble_context
+from mriynyk.db import get_connection_pool
+from mriynyk.llm import LlmProvider, embed_texts, get_async_llm_client
+from mriynyk.metrics import record_usage, timed
+from mriynyk.models import (
+    DisciplineName,
+    Page,
+    RetrievalMode,
+    StreamEvent,
+    Subject,
+    TopicRequest,
+    TopicResponse,
+    Workbook,
+    Year,
+)
+from mriynyk.prompts import render_prompt_async
+from mriynyk.single_flight import SingleFlight
+from mriynyk.topic_catalogue import get_topic_catalogue
+from mriynyk.topic_matcher import get_topic_matcher
+from mriynyk.workbook_cache import WorkbookCacheKey, get_workbook_cache
+
+TOPIC_INDEX_PATTERN = re.compile(r"\d+")
+WORKBOOK_MODEL = "gpt-5.2"
+WORKBOOK_REASONING_EFFORT = "low"
+
+PAGES_SQL = sql.SQL(
+    "SELECT {}, {} FROM {}.{} WHERE {} = %s AND {} = %s AND {} = %s "
+    "ORDER BY (substring({}::text from '[\"'']book_page_number[\"'']\\s*:\\s*([0-9]+)'))::int "
+    "ASC NULLS LAST"
+).format(
+    sql.Identifier(DEFAULT_PAGE_TEXT_COLUMN),
+    sql.Identifier("page_metadata"),
+    sql.Identifier(DEFAULT_SCHEMA_NAME),
+    sql.Identifier(DEFAULT_TABLE_NAME),
+    sql.Identifier(DEFAULT_GRADE_COLUMN),
+    sql.Identifier(DEFAULT_DISCIPLINE_COLUMN),
+    sql.Identifier("topic_title"),
+    sql.Identifier("page_metadata"),
+)
+
+NEAREST_PAGES_SQL = sql.SQL(
+    "SELECT {}, {}, {} FROM {}.{} WHERE {} = %s AND {} = %s "
+    "ORDER BY {} <=> %s::vector LIMIT %s"
+).format(
+    sql.Identifier(DEFAULT_PAGE_TEXT_COLUMN),
+    sql.Identifier("page_metadata"),
+    sql.Identifier("topic_title"),
+    sql.Identifier(DEFAULT_SCHEMA_NAME),
+    sql.Identifier(DEFAULT_TABLE_NAME),
+    sql.Identifier(DEFAULT_GRADE_COLUMN),
+    sql.Identifier(DEFAULT_DISCIPLINE_COLUMN),
+    sql.Identifier(DEFAULT_VECTOR_COLUMN),
+)
+
+SET_EF_SEARCH_SQL = sql.SQL("SELECT set_config('hnsw.ef_search', %s, true)")
+
+
+def _parse_page_metadata(page_metadata: object) -> object:
+    if not isinstance(page_metadata, str):
+        return page_metadata
+    # The loader stores dict metadata as its Python repr, not JSON.
+    try:
+        return json.loads(page_metadata)
+    except ValueError:
+        pass
+    try:
+        return ast.literal_eval(page_metadata)
+    except (ValueError, SyntaxError):
+        return None
 
 
 def _extract_exercises(page_metadata: object) -> List[str]:
+    page_metadata = _parse_page_metadata(page_metadata)
     if not isinstance(page_metadata, dict):
         return []
     exercises = page_metadata.get("exercises")
@@ -36,86 +111,87 @@ def _extract_exercises(page_metadata: object) -> List[str]:
     return exercise_texts
 
 
-def pick_topic(topic: str, topics: List[str]) -> str:
-    env = Environment(loader=FileSystemLoader("prompts"))
-    template = env.get_template("pick_topic.j2")
-    prompt = template.render(
-        {
-            "topic": topic,
-            "topics": topics,
-        }
-    )
-
-    client = OpenAI(
-        api_key=resolve_api_key(),
-        base_url=LAPA_PROVIDER_BASE_URL,
-    )
-    response = client.chat.completions.create(
-        model="lapa",
-        messages=[
+async def pick_topic(topic: str, topics: List[str], fallback: Optional[str] = None) -> str:
+    with timed("prompt_render"):
+        prompt = await render_prompt_async(
+            "pick_topic.j2",
             {
-                "role": "user",
-                "content": prompt,
+                "topic": topic,
+                "topics": topics,
             }
-        ],
-        temperature=0,
-        max_tokens=100,
-    )
-    try:
-        topic_index = int(response.choices[0].message.content or "-1")
-    except ValueError:
-        topic_index = -1
+        )
 
-    topic = topics[topic_index]
-    logging.info(f"Вибрана тема: {topic}") 
+    client = get_async_llm_client(LlmProvider.lapa)
+    with timed("pick_topic"):
+        response = await client.chat.completions.create(
+            model="lapa",
+            messages=[
+                {
+                    "role": "user",
+                    "content": prompt,
+                }
+            ],
+            temperature=0,
+            max_tokens=100,
+        )
+    record_usage("pick_topic", response.usage)
+    index_match = TOPIC_INDEX_PATTERN.search(response.choices[0].message.content or "")
+    topic_index = int(index_match.group()) if index_match else -1
+    if 0 <= topic_index < len(topics):
+        topic = topics[topic_index]
+    else:
+        logging.warning("pick_topic returned an unusable index: %r", response.choices[0].message.content)
+        topic = fallback if fallback is not None else topics[-1]
+    logging.info(f"Вибрана тема: {topic}")
     return topic
 
 
-def fetch_closest_chapter_pages(
+async def resolve_topic_title(
     database_url: str,
     topic: str,
     grade_value: int,
     discipline_name: DisciplineName,
+) -> str:
+    with timed("topic_query"):
+        topics = await get_topic_catalogue().topics(database_url, grade_value, discipline_name)
+    if not topics:
+        raise ValueError("No topics found in the database.")
+    with timed("topic_match"):
+        match, confident = await get_topic_matcher().match(topic, topics)
+    if confident:
+        logging.info(
+            "Topic matched locally: method=%s confidence=%.3f margin=%.3f title=%s",
+            match.method,
+            match.score,
+            match.margin,
+            match.title,
+        )
+        return match.title
+    logging.info(
+        "Topic match ambiguous (method=%s confidence=%.3f margin=%.3f), asking the LLM",
+        match.method,
+        match.score,
+        match.margin,
+    )
+    return await pick_topic(topic, list(topics), fallback=match.title)
+
+
+async def fetch_topic_pages(
+    database_url: str,
+    topic_title: str,
+    grade_value: int,
+    discipline_name: DisciplineName,
 ) -> List[Page]:
-    unique_topics_sql = sql.SQL("SELECT DISTINCT {} FROM {}.{} WHERE {} = %s AND {} = %s").format(
-        sql.Identifier("topic_title"),
-        sql.Identifier(DEFAULT_SCHEMA_NAME),
-        sql.Identifier(DEFAULT_TABLE_NAME),
-        sql.Identifier(DEFAULT_GRADE_COLUMN),
-        sql.Identifier(DEFAULT_DISCIPLINE_COLUMN),
-    )
-
-    pages_sql = sql.SQL(
-        "SELECT {}, {} FROM {}.{} WHERE {} = %s AND {} = %s AND {} = %s "
-        "ORDER BY (substring({}::text from '[\"'']book_page_number[\"'']\\s*:\\s*([0-9]+)'))::int "
-        "ASC NULLS LAST"
-    ).format(
-        sql.Identifier(DEFAULT_PAGE_TEXT_COLUMN),
-        sql.Identifier("page_metadata"),
-        sql.Identifier(DEFAULT_SCHEMA_NAME),
-        sql.Identifier(DEFAULT_TABLE_NAME),
-        sql.Identifier(DEFAULT_GRADE_COLUMN),
-        sql.Identifier(DEFAULT_DISCIPLINE_COLUMN),
-        sql.Identifier("topic_title"),
-        sql.Identifier("page_metadata"),
-    )
-    with psycopg.connect(database_url) as connection:
-        with connection.cursor() as cursor:
-            cursor.execute(
-                unique_topics_sql,
-                (grade_value, discipline_name),
-            )
-            rows = cursor.fetchall()
-            if not rows:
-                raise ValueError("No topics found in the database.")
-            topics = [row[0] for row in rows]
-            topic_title = pick_topic(topic, topics)
-
-            cursor.execute(
-                pages_sql,
-                (grade_value, discipline_name, topic_title),
-            )
-            page_rows = cursor.fetchall()
+    with timed("pages_query"):
+        pool = await get_connection_pool(database_url)
+        async with pool.connection() as connection:
+            async with connection.cursor() as cursor:
+                await cursor.execute(
+                    PAGES_SQL,
+                    (grade_value, discipline_name, topic_title),
+                    prepare=True,
+                )
+                page_rows = await cursor.fetchall()
     if not page_rows:
         raise ValueError("No rows found for the closest topic_title.")
     pages: List[Page] = []
@@ -129,65 +205,290 @@ def fetch_closest_chapter_pages(
     return pages
 
 
-def generate_workbook_prompt(
+async def embed_query(text: str) -> List[float]:
+    with timed("embed_query"):
+        return (await embed_texts([text]))[0]
+
+
+def _vector_literal(vector: Sequence[float]) -> str:
+    return "[" + ",".join(repr(float(value)) for value in vector) + "]"
+
+
+async def fetch_nearest_pages(
+    database_url: str,
+    vector: Sequence[float],
+    grade_value: int,
+    discipline_name: DisciplineName,
+) -> tuple[List[Page], List[str]]:
+    settings = resolve_vector_search_settings()
+    with timed("nearest_pages_query"):
+        pool = await get_connection_pool(database_url)
+        async with pool.connection() as connection:
+            async with connection.transaction():
+                # set_config(..., true) scopes ef_search to this transaction only.
+                await connection.execute(SET_EF_SEARCH_SQL, (str(settings.ef_search),))
+                cursor = await connection.execute(
+                    NEAREST_PAGES_SQL,
+                    (grade_value, discipline_name, _vector_literal(vector), settings.limit),
+                    prepare=True,
+                )
+                page_rows = await cursor.fetchall()
+    if not page_rows:
+        raise ValueError("No pages found for the query vector.")
+    pages: List[Page] = []
+    topic_titles: List[str] = []
+    for page_text, page_metadata, topic_title in page_rows:
+        pages.append(
+            Page(
+                text=str(page_text),
+                exercies=_extract_exercises(page_metadata),
+            )
+        )
+        topic_titles.append(str(topic_title))
+    return pages, topic_titles
+
+
+async def fetch_closest_chapter_pages(
+    database_url: str,
+    grade_value: int,
+    discipline_name: DisciplineName,
+    topic: Optional[str] = None,
+    vector: Optional[Sequence[float]] = None,
+) -> List[Page]:
+    if vector is not None:
+        pages, _ = await fetch_nearest_pages(
+            database_url=database_url,
+            vector=vector,
+            grade_value=grade_value,
+            discipline_name=discipline_name,
+        )
+        return pages
+    if topic is None:
+        raise ValueError("Either topic or vector is required.")
+    topic_title = await resolve_topic_title(
+        database_url=database_url,
+        topic=topic,
+        grade_value=grade_value,
+        discipline_name=discipline_name,
+    )
+    return await fetch_topic_pages(
+        database_url=database_url,
+        topic_title=topic_title,
+        grade_value=grade_value,
+        discipline_name=discipline_name,
+    )
+
+
+async def select_chapter(
+    database_url: str,
+    topic: str,
+    grade_value: int,
+    discipline_name: DisciplineName,
+    retrieval: RetrievalMode,
+) -> tuple[str, Optional[List[Page]]]:
+    if retrieval is RetrievalMode.vector:
+        pages, topic_titles = await fetch_nearest_pages(
+            database_url=database_url,
+            vector=await embed_query(topic),
+            grade_value=grade_value,
+            discipline_name=discipline_name,
+        )
+        topic_title = Counter(topic_titles).most_common(1)[0][0]
+        return topic_title, pages
+    topic_title = await resolve_topic_title(
+        database_url=database_url,
+        topic=topic,
+        grade_value=grade_value,
+        discipline_name=discipline_name,
+    )
+    return topic_title, None
+
+
+async def generate_workbook_prompt(
     topic: str,
     subject: Subject,
     chapter_text: str,
     student_info: str,
 ) -> str:
-    env = Environment(loader=FileSystemLoader("prompts"))
-    template = env.get_template("generate_workbook.j2")
-    prompt = template.render(
-        {
-            "topic": topic,
-            "subject": subject.value,
-            "chapter_text": chapter_text,
-            "student_info": student_info,
-        }
-    )
+    with timed("prompt_render"):
+        prompt = await render_prompt_async(
+            "generate_workbook.j2",
+            {
+                "topic": topic,
+                "subject": subject.value,
+                "chapter_text": chapter_text,
+                "student_info": student_info,
+            }
+        )
     return prompt
 
 
+def build_chapter_context(topic: str, closest_chapter_pages: List[Page]) -> AssembledContext:
+    with timed("context_assembly"):
+        context = assemble_context(
+            closest_chapter_pages,
+            query=topic,
+            token_budget=resolve_context_token_budget(),
+        )
+    usage = context.usage
+    logging.info(
+        "Chapter context: %s/%s tokens (budget %s), %s/%s pages, %s/%s exercises",
+        usage.tokens_used,
+        usage.tokens_available,
+        usage.token_budget,
+        usage.pages_used,
+        usage.pages_total,
+        usage.exercises_used,
+        usage.exercises_total,
+    )
+    return context
+
+
 # TODO: – Compare quality of higher/lower reasoning efforts
-def generate_workbook(
+async def generate_workbook(
     topic: str,
     subject: Subject,
     closest_chapter_pages: List[Page],
     student_info: str,
 ) -> Optional[Workbook]:
-    client = OpenAI()
+    client = get_async_llm_client(LlmProvider.openai)
 
-    chapter_text = "\n".join([page.text for page in closest_chapter_pages])
-    prompt = generate_workbook_prompt(
+    context = build_chapter_context(topic, closest_chapter_pages)
+    prompt = await generate_workbook_prompt(
         topic=topic,
         subject=subject,
-        chapter_text=chapter_text,
+        chapter_text=context.chapter_text,
         student_info=student_info,
     )
 
-    response = client.responses.parse(
-        model="gpt-5.2",
-        reasoning={"effort": "low"},
-        input=prompt,
-        text_format=Workbook,
-    )
+    with timed("generate_workbook"):
+        response = await client.responses.parse(
+            model=WORKBOOK_MODEL,
+            reasoning={"effort": WORKBOOK_REASONING_EFFORT},
+            input=prompt,
+            text_format=Workbook,
+        )
+    record_usage("generate_workbook", response.usage)
 
     workbook = response.output_parsed
     return workbook
 
 
-def answer_topic(topic: str, year: Year, subject: Subject, student_info: str) -> Workbook:
+async def stream_workbook(
+    topic: str,
+    subject: Subject,
+    closest_chapter_pages: List[Page],
+    student_info: str,
+) -> AsyncIterator[StreamEvent]:
+    client = get_async_llm_client(LlmProvider.openai)
+
+    context = build_chapter_context(topic, closest_chapter_pages)
+    prompt = await generate_workbook_prompt(
+        topic=topic,
+        subject=subject,
+        chapter_text=context.chapter_text,
+        student_info=student_info,
+    )
+
+    yield StreamEvent("context", asdict(context.usage))
+
+    emitted_length = 0
+    markdown_complete = False
+    # Includes time the client spends reading the stream.
+    with timed("generate_workbook_stream"):
+        async with client.responses.stream(
+            model=WORKBOOK_MODEL,
+            reasoning={"effort": WORKBOOK_REASONING_EFFORT},
+            input=prompt,
+            text_format=Workbook,
+        ) as stream:
+            async for event in stream:
+                if event.type != "response.output_text.delta" or markdown_complete:
+                    continue
+                # markdown_text is the first Workbook field, so it streams before the quiz.
+                partial = from_json(event.snapshot.encode(), partial_mode="trailing-strings")
+                if not isinstance(partial, dict):
+                    continue
+                markdown_text = partial.get("markdown_text")
+                if isinstance(markdown_text, str) and len(markdown_text) > emitted_length:
+                    yield StreamEvent("markdown", {"delta": markdown_text[emitted_length:]})
+                    emitted_length = len(markdown_text)
+                markdown_complete = "quiz_questions" in partial
+            response = await stream.get_final_response()
+    record_usage("generate_workbook_stream", response.usage)
+
+    workbook = response.output_parsed
+    if workbook is None:
+        raise ValueError("Workbook missing from the model response.")
+    if len(workbook.markdown_text) > emitted_length:
+        yield StreamEvent("markdown", {"delta": workbook.markdown_text[emitted_length:]})
+    yield StreamEvent(
+        "quiz",
+        {"quiz_questions": [question.model_dump() for question in workbook.quiz_questions]},
+    )
+
+
+def workbook_cache_key(
+    topic_title: str,
+    year: Year,
+    subject: Subject,
+    student_info: str,
+    retrieval: RetrievalMode,
+    pages: Optional[List[Page]] = None,
+) -> WorkbookCacheKey:
+    return WorkbookCacheKey(
+        model=WORKBOOK_MODEL,
+        grade=year.value,
+        discipline=subject.value,
+        topic_title=topic_title,
+        student_info=student_info,
+        retrieval=retrieval_key(retrieval, pages),
+    )
+
+
+def retrieval_key(retrieval: RetrievalMode, pages: Optional[List[Page]]) -> str:
+    if pages is None:
+        return retrieval.value
+    # Vector hits sharing a majority title can still differ, so the page set is part of the key.
+    digest = hashlib.sha256("\0".join(sorted(page.text for page in pages)).encode("utf-8"))
+    return f"{retrieval.value}:{digest.hexdigest()[:16]}"
+
+
+async def answer_topic(
+    topic: str,
+    year: Year,
+    subject: Subject,
+    student_info: str,
+    retrieval: RetrievalMode = RetrievalMode.topic,
+) -> Workbook:
     database_url = resolve_database_url(None)
     discipline_name: DisciplineName = subject.value
 
-    closest_chapter_pages = fetch_closest_chapter_pages(
+    topic_title, closest_chapter_pages = await select_chapter(
         database_url=database_url,
         topic=topic,
         grade_value=year.value,
         discipline_name=discipline_name,
+        retrieval=retrieval,
     )
+    cache = get_workbook_cache()
+    cache_key = workbook_cache_key(
+        topic_title, year, subject, student_info, retrieval, closest_chapter_pages
+    )
+    with timed("workbook_cache"):
+        cached_workbook = await cache.get(cache_key)
+    if cached_workbook is not None:
+        return cached_workbook
+
+    if closest_chapter_pages is None:
+        closest_chapter_pages = await fetch_topic_pages(
+            database_url=database_url,
+            topic_title=topic_title,
+            grade_value=year.value,
+            discipline_name=discipline_name,
+        )
 
-    workbook = generate_workbook(
+    workbook = await generate_workbook(
         topic=topic,
         subject=subject,
         closest_chapter_pages=closest_chapter_pages,
@@ -197,14 +498,97 @@ def answer_topic(topic: str, year: Year, subject: Subject, student_info: str) ->
     if workbook is None:
         raise ValueError("Workbook missing from the model response.")
 
+    await cache.put(cache_key, workbook)
     return workbook
 
 
-def answer_request(request: TopicRequest) -> TopicResponse:
-    workbook = answer_topic(
+@lru_cache(maxsize=1)
+def get_answer_flights() -> SingleFlight[TopicResponse]:
+    return SingleFlight(
+        "mriynyk_answer_requests_coalesced_total",
+        "Answer requests that joined an identical request already in flight.",
+    )
+
+
+async def compute_answer(request: TopicRequest) -> TopicResponse:
+    workbook = await answer_topic(
         request.topic,
         request.year,
         request.subject,
         request.student_info,
+        request.retrieval,
     )
     return TopicResponse(result=workbook.markdown_text, quiz_questions=workbook.quiz_questions)
+
+
+async def answer_request(request: TopicRequest) -> TopicResponse:
+    # A teacher generating for a whole class sends many identical requests at once.
+    key = (
+        request.year,
+        request.subject,
+        request.topic,
+        request.student_info,
+        request.retrieval,
+    )
+    return await get_answer_flights().run(key, lambda: compute_answer(request))
+
+
+async def stream_answer_request(request: TopicRequest) -> AsyncIterator[StreamEvent]:
+    database_url = resolve_database_url(None)
+    discipline_name: DisciplineName = request.subject.value
+
+    topic_title, closest_chapter_pages = await select_chapter(
+        database_url=database_url,
+        topic=request.topic,
+        grade_value=request.year.value,
+        discipline_name=discipline_name,
+        retrieval=request.retrieval,
+    )
+    yield StreamEvent("topic", {"title": topic_title})
+
+    cache = get_workbook_cache()
+    cache_key = workbook_cache_key(
+        topic_title,
+        request.year,
+        request.subject,
+        request.student_info,
+        request.retrieval,
+        closest_chapter_pages,
+    )
+    with timed("workbook_cache"):
+        cached_workbook = await cache.get(cache_key)
+    if cached_workbook is not None:
+        yield StreamEvent("markdown", {"delta": cached_workbook.markdown_text})
+        yield StreamEvent(
+            "quiz",
+            {"quiz_questions": [question.model_dump() for question in cached_workbook.quiz_questions]},
+        )
+        yield StreamEvent("done", {})
+        return
+
+    if closest_chapter_pages is None:
+        closest_chapter_pages = await fetch_topic_pages(
+            database_url=database_url,
+            topic_title=topic_title,
+            grade_value=request.year.value,
+            discipline_name=discipline_name,
+        )
+    markdown_parts: List[str] = []
+    async for event in stream_workbook(
+        topic=request.topic,
+        subject=request.subject,
+        closest_chapter_pages=closest_chapter_pages,
+        student_info=request.student_info,
+    ):
+        if event.event == "markdown":
+            markdown_parts.append(event.data["delta"])
+        elif event.event == "quiz":
+            await cache.put(
+                cache_key,
+                Workbook(
+                    markdown_text="".join(markdown_parts),
+                    quiz_questions=event.data["quiz_questions"],
+                ),
+            )
+        yield event
+    yield StreamEvent("done", {})
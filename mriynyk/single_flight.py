@@ -0,0 +1,51 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Generic, Hashable, TypeVar
+
+from mriynyk.metrics import get_metrics
+
+T = TypeVar("T")
+
+
+@dataclass
+class _Flight(Generic[T]):
+    task: asyncio.Task[T]
+    waiters: int = 0
+
+
+class SingleFlight(Generic[T]):
+    def __init__(self, metric_name: str, help_text: str) -> None:
+        self._in_flight: dict[Hashable, _Flight[T]] = {}
+        self.coalesced = 0
+        get_metrics().register_value(metric_name, "counter", help_text, lambda: self.coalesced)
+
+    async def run(self, key: Hashable, compute: Callable[[], Awaitable[T]]) -> T:
+        flight = self._in_flight.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(compute()))
+            self._in_flight[key] = flight
+            flight.task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self.coalesced += 1
+        flight.waiters += 1
+        try:
+            # Shielded so one caller leaving does not cancel the work for the others.
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # The last caller gave up (disconnect or timeout): nobody needs the result.
+                if self._in_flight.get(key) is flight:
+                    del self._in_flight[key]
+                flight.task.cancel()
+
+    def in_flight(self) -> int:
+        return len(self._in_flight)
+
+    def _finish(self, key: Hashable, task: asyncio.Task[T]) -> None:
+        flight = self._in_flight.get(key)
+        if flight is not None and flight.task is task:
+            del self._in_flight[key]
+        # Marks the exception as retrieved when every caller has gone away.
+        if not task.cancelled():
+            task.exception()
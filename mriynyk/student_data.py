@@ -1,26 +1,41 @@
 from __future__ import annotations
 
-from functools import lru_cache
+import json
+import logging
+from dataclasses import dataclass, field
+from datetime import date
+from functools import lru_cache, partial
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Hashable, Sequence, TypeVar
 
+import numpy as np
 import pandas as pd
 
+from mriynyk.arrow_store import has_frames, map_frames, prune_stores, store_dir, write_frames
+from mriynyk.config import (
+    resolve_student_data_backend,
+    resolve_student_data_check_seconds,
+    resolve_student_data_compact,
+    resolve_student_data_dir,
+    resolve_student_data_shared_dir,
+)
+from mriynyk.data_version import DataVersionManager
+from mriynyk.metrics import timed
 from mriynyk.models import (
-    AbsenceItem,
     OverviewResponse,
-    ScoreItem,
+    StudentDataBackend,
     StudentAverage,
-    StudentDataResponse,
     StudentListItem,
     SubjectAverage,
     SubjectCount,
 )
+from mriynyk.student_query import DayRange, ParquetQueryEngine
+
+logger = logging.getLogger(__name__)
 
-PROJECT_ROOT = Path(__file__).resolve().parents[1]
-DATA_DIR = PROJECT_ROOT / "data"
-ABSENCES_PATH = DATA_DIR / "benchmark_absences.parquet"
-SCORES_PATH = DATA_DIR / "benchmark_scores.parquet"
+ABSENCES_FILE_NAME = "benchmark_absences.parquet"
+SCORES_FILE_NAME = "benchmark_scores.parquet"
+FRAME_NAMES = ("absences", "scores")
 
 ABSENCE_COLUMNS = (
     "student_id",
@@ -38,16 +53,338 @@ SCORE_COLUMNS = (
     "grade",
 )
 RECENT_DAYS = 30
+MAX_PAGE_LIMIT = 500
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class StudentIndex:
+    frame: pd.DataFrame
+    offsets: dict[int, tuple[int, int]]
+
+    def rows_for(self, student_id: int) -> pd.DataFrame:
+        bounds = self.offsets.get(student_id)
+        if bounds is None:
+            return self.frame.iloc[0:0]
+        start, stop = bounds
+        return self.frame.iloc[start:stop]
+
+    def rows_for_many(self, student_ids: Sequence[int]) -> pd.DataFrame:
+        ranges = [
+            self.offsets[student_id] for student_id in student_ids if student_id in self.offsets
+        ]
+        if not ranges:
+            return self.frame.iloc[0:0]
+        positions = np.concatenate([np.arange(start, stop) for start, stop in ranges])
+        return self.frame.iloc[positions]
+
+
+@dataclass(frozen=True)
+class DailyRollup:
+    keys: np.ndarray
+    days: np.ndarray
+    grades: np.ndarray
+    codes: np.ndarray
+    counts: np.ndarray
+    totals: np.ndarray
+
+    def last_day(self, grade: int | None) -> np.datetime64 | None:
+        days = self.days if grade is None else self.days[self.grades == grade]
+        return days[-1] if len(days) else None
+
+    def totals_between(
+        self,
+        grade: int | None,
+        start: np.datetime64 | None,
+        end: np.datetime64 | None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        lo = 0 if start is None else int(np.searchsorted(self.days, start, side="left"))
+        hi = len(self.days) if end is None else int(np.searchsorted(self.days, end, side="right"))
+        codes = self.codes[lo:hi]
+        counts = self.counts[lo:hi]
+        totals = self.totals[lo:hi]
+        if grade is not None:
+            in_grade = self.grades[lo:hi] == grade
+            codes, counts, totals = codes[in_grade], counts[in_grade], totals[in_grade]
+        size = len(self.keys)
+        return (
+            np.bincount(codes, weights=counts, minlength=size),
+            np.bincount(codes, weights=totals, minlength=size),
+        )
+
+
+@dataclass(frozen=True)
+class OverviewRollups:
+    subject_scores: DailyRollup
+    student_scores: DailyRollup
+    subject_absences: DailyRollup
+
+
+@dataclass(frozen=True)
+class StudentDataset:
+    version: str
+    absences: pd.DataFrame
+    scores: pd.DataFrame
+    absence_index: StudentIndex
+    score_index: StudentIndex
+    rollups: OverviewRollups
+    memory: dict[str, dict[str, float]]
+    storage: str
+    # Derived results live with the frames they came from, so a swap drops them too.
+    memo: dict[Hashable, Any] = field(default_factory=dict)
+
+    def memoize(self, key: Hashable, compute: Callable[[], T]) -> T:
+        if key not in self.memo:
+            self.memo[key] = compute()
+        return self.memo[key]
+
+
+@dataclass(frozen=True)
+class OverviewWindow:
+    days: int | None = RECENT_DAYS
+    date_from: date | None = None
+    date_to: date | None = None
+
+
+@dataclass(frozen=True)
+class HistoryWindow:
+    limit: int | None = None
+    absences_before: date | None = None
+    scores_before: date | None = None
+    date_from: date | None = None
+    date_to: date | None = None
+    days: int | None = None
+
+
+def sort_by_student(dataframe: pd.DataFrame) -> pd.DataFrame:
+    # Stable, so each student's rows keep their file order.
+    return dataframe.sort_values("student_id", kind="stable", ignore_index=True)
+
+
+def build_student_index(dataframe: pd.DataFrame) -> StudentIndex:
+    student_ids = dataframe["student_id"].to_numpy()
+    unique_ids, starts, counts = np.unique(student_ids, return_index=True, return_counts=True)
+    offsets = {
+        int(student_id): (int(start), int(start + count))
+        for student_id, start, count in zip(unique_ids, starts, counts)
+    }
+    return StudentIndex(frame=dataframe, offsets=offsets)
+
+
+def compact_common(dataframe: pd.DataFrame) -> pd.DataFrame:
+    return dataframe.assign(
+        student_id=pd.to_numeric(dataframe["student_id"], downcast="integer"),
+        grade=pd.to_numeric(dataframe["grade"], downcast="integer"),
+        discipline_name=dataframe["discipline_name"].astype("category"),
+        lesson_date=lesson_dates(dataframe).dt.normalize(),
+    )
+
+
+def read_absences(path: Path, compact: bool = False) -> pd.DataFrame:
+    absences = pd.read_parquet(path, columns=list(ABSENCE_COLUMNS))
+    if compact:
+        absences = compact_common(absences).assign(
+            absence_reason=absences["absence_reason"].astype("category")
+        )
+    return sort_by_student(absences)
+
+
+def parse_score_values(scores: pd.DataFrame) -> pd.Series:
+    numeric = pd.to_numeric(scores["score_numeric"], errors="coerce").astype("float64")
+    text = (
+        scores["score_text"]
+        .astype("string")
+        .str.strip()
+        .str.replace(",", ".", regex=False)
+    )
+    return numeric.fillna(pd.to_numeric(text, errors="coerce").astype("float64"))
+
+
+def read_scores(path: Path, compact: bool = False) -> pd.DataFrame:
+    scores = pd.read_parquet(path, columns=list(SCORE_COLUMNS))
+    scores["score_value"] = parse_score_values(scores)
+    if compact:
+        # Nothing reads the raw score columns once score_value exists.
+        scores = compact_common(scores).drop(columns=["score_numeric", "score_text"])
+    return sort_by_student(scores)
+
+
+def describe_memory(dataframe: pd.DataFrame) -> dict[str, float]:
+    total_bytes = int(dataframe.memory_usage(index=True, deep=True).sum())
+    return {
+        "rows": len(dataframe),
+        "bytes": total_bytes,
+        "bytes_per_row": round(total_bytes / len(dataframe), 1) if len(dataframe) else 0.0,
+    }
+
+
+def build_daily_rollup(
+    keys: pd.Series,
+    grades: pd.Series,
+    days: pd.Series,
+    counts: pd.Series,
+    totals: pd.Series,
+) -> DailyRollup:
+    frame = pd.DataFrame(
+        {"key": keys, "grade": grades, "day": days, "count": counts, "total": totals}
+    )
+    # groupby drops rows whose lesson_date did not parse, as the raw-row windows did.
+    daily = (
+        frame.groupby(["day", "grade", "key"], observed=True)[["count", "total"]]
+        .sum()
+        .reset_index()
+    )
+    unique_keys, codes = np.unique(daily["key"].to_numpy(), return_inverse=True)
+    return DailyRollup(
+        keys=unique_keys,
+        days=daily["day"].to_numpy(dtype="datetime64[D]"),
+        grades=daily["grade"].to_numpy(),
+        codes=codes,
+        counts=daily["count"].to_numpy(dtype="float64"),
+        totals=daily["total"].to_numpy(dtype="float64"),
+    )
+
+
+def build_rollups(absences: pd.DataFrame, scores: pd.DataFrame) -> OverviewRollups:
+    score_days = lesson_dates(scores).dt.normalize()
+    score_values = scores["score_value"]
+    scored = score_values.notna()
+    absence_days = lesson_dates(absences).dt.normalize()
+    return OverviewRollups(
+        subject_scores=build_daily_rollup(
+            scores["discipline_name"],
+            scores["grade"],
+            score_days,
+            scored.astype("int64"),
+            score_values.fillna(0.0),
+        ),
+        student_scores=build_daily_rollup(
+            scores.loc[scored, "student_id"],
+            scores.loc[scored, "grade"],
+            score_days[scored],
+            pd.Series(1, index=score_values.index[scored]),
+            score_values[scored],
+        ),
+        subject_absences=build_daily_rollup(
+            absences["discipline_name"],
+            absences["grade"],
+            absence_days,
+            pd.Series(1, index=absences.index),
+            pd.Series(0.0, index=absences.index),
+        ),
+    )
+
+
+@dataclass(frozen=True)
+class DataSource:
+    absences_path: Path
+    scores_path: Path
+    compact: bool
+    shared_dir: Path | None
+
+
+def read_frames(source: DataSource) -> tuple[pd.DataFrame, pd.DataFrame]:
+    return read_absences(source.absences_path, source.compact), read_scores(
+        source.scores_path, source.compact
+    )
+
+
+def load_frames(source: DataSource, version: str) -> tuple[pd.DataFrame, pd.DataFrame, str]:
+    if source.shared_dir is None:
+        return (*read_frames(source), "parquet")
+    directory = store_dir(source.shared_dir, version, source.compact)
+    try:
+        if not has_frames(directory, FRAME_NAMES):
+            absences, scores = read_frames(source)
+            write_frames(directory, {"absences": absences, "scores": scores})
+            prune_stores(source.shared_dir, keep=directory)
+        frames = map_frames(directory, FRAME_NAMES)
+    except OSError:
+        logger.warning("Shared Arrow store at %s unavailable", directory, exc_info=True)
+        return (*read_frames(source), "parquet")
+    return frames["absences"], frames["scores"], "arrow-mmap"
+
+
+@timed("student_data_load")
+def load_dataset(source: DataSource, version: str) -> StudentDataset:
+    absences, scores, storage = load_frames(source, version)
+    memory = {"absences": describe_memory(absences), "scores": describe_memory(scores)}
+    logger.info(
+        "Loaded student data %s from %s: absences %s B/row, scores %s B/row (compact=%s)",
+        version,
+        storage,
+        memory["absences"]["bytes_per_row"],
+        memory["scores"]["bytes_per_row"],
+        source.compact,
+    )
+    return StudentDataset(
+        version=version,
+        absences=absences,
+        scores=scores,
+        absence_index=build_student_index(absences),
+        score_index=build_student_index(scores),
+        rollups=build_rollups(absences, scores),
+        memory=memory,
+        storage=storage,
+    )
 
 
 @lru_cache(maxsize=1)
-def load_absences() -> pd.DataFrame:
-    return pd.read_parquet(ABSENCES_PATH, columns=list(ABSENCE_COLUMNS))
+def get_data_manager() -> DataVersionManager[StudentDataset]:
+    data_dir = resolve_student_data_dir()
+    source = DataSource(
+        absences_path=data_dir / ABSENCES_FILE_NAME,
+        scores_path=data_dir / SCORES_FILE_NAME,
+        compact=resolve_student_data_compact(),
+        shared_dir=resolve_student_data_shared_dir(),
+    )
+    return DataVersionManager(
+        name="student",
+        paths=(source.absences_path, source.scores_path),
+        load=partial(load_dataset, source),
+        check_seconds=resolve_student_data_check_seconds(),
+    )
 
 
 @lru_cache(maxsize=1)
+def get_query_engine() -> ParquetQueryEngine | None:
+    if StudentDataBackend(resolve_student_data_backend()) is not StudentDataBackend.dataset:
+        return None
+    data_dir = resolve_student_data_dir()
+    return ParquetQueryEngine(
+        {
+            "absences": data_dir / ABSENCES_FILE_NAME,
+            "scores": data_dir / SCORES_FILE_NAME,
+        }
+    )
+
+
+def current_dataset() -> StudentDataset:
+    return get_data_manager().current()
+
+
+def data_stats() -> dict[str, object]:
+    manager = get_data_manager()
+    dataset = manager.loaded()
+    if dataset is None:
+        return {**manager.stats(), "storage": None, "memory": None}
+    return {**manager.stats(), "storage": dataset.storage, "memory": dataset.memory}
+
+
+def data_version() -> str:
+    engine = get_query_engine()
+    if engine is not None:
+        return engine.version
+    return current_dataset().version
+
+
+def load_absences() -> pd.DataFrame:
+    return current_dataset().absences
+
+
 def load_scores() -> pd.DataFrame:
-    return pd.read_parquet(SCORES_PATH, columns=list(SCORE_COLUMNS))
+    return current_dataset().scores
 
 
 def format_date(value: Any) -> str:
@@ -60,18 +397,6 @@ def format_date(value: Any) -> str:
     return str(value)
 
 
-def parse_score(score_numeric: Any, score_text: Any) -> float | None:
-    if score_numeric is not None and not pd.isna(score_numeric):
-        return float(score_numeric)
-    if isinstance(score_text, str):
-        trimmed = score_text.strip().replace(",", ".")
-        try:
-            return float(trimmed)
-        except ValueError:
-            return None
-    return None
-
-
 def normalize_reason(value: Any) -> str:
     if value is None or pd.isna(value):
         return "—"
@@ -79,23 +404,41 @@ def normalize_reason(value: Any) -> str:
 
 
 def apply_filters(
-    dataframe: pd.DataFrame,
+    index: StudentIndex,
     student_id: int,
     grade: int | None,
     subject: str | None,
 ) -> pd.DataFrame:
-    mask = dataframe["student_id"] == student_id
+    return filter_rows(index.rows_for(student_id), grade, subject)
+
+
+def filter_rows(rows: pd.DataFrame, grade: int | None, subject: str | None) -> pd.DataFrame:
+    if grade is None and not subject:
+        return rows
+    mask = np.ones(len(rows), dtype=bool)
     if grade is not None:
-        mask &= dataframe["grade"] == grade
+        mask &= rows["grade"].to_numpy() == grade
     if subject:
-        mask &= dataframe["discipline_name"] == subject
-    return dataframe.loc[mask]
+        mask &= rows["discipline_name"].to_numpy() == subject
+    return rows.loc[mask]
 
 
-@lru_cache(maxsize=6)
+@timed("student_list")
 def list_student_ids(grade: int | None) -> tuple[int, ...]:
-    absences = load_absences()
-    scores = load_scores()
+    engine = get_query_engine()
+    if engine is not None:
+        return engine.memoize(
+            ("student_ids", grade), lambda: tuple(sorted(engine.student_ids(grade)))
+        )
+    dataset = current_dataset()
+    return dataset.memoize(
+        ("student_ids", grade), lambda: compute_student_ids(dataset, grade)
+    )
+
+
+def compute_student_ids(dataset: StudentDataset, grade: int | None) -> tuple[int, ...]:
+    absences = dataset.absences
+    scores = dataset.scores
     if grade is not None:
         absences = absences[absences["grade"] == grade]
         scores = scores[scores["grade"] == grade]
@@ -103,6 +446,22 @@ def list_student_ids(grade: int | None) -> tuple[int, ...]:
     return tuple(sorted(int(value) for value in student_ids))
 
 
+def list_grades() -> tuple[int, ...]:
+    engine = get_query_engine()
+    if engine is not None:
+        return engine.memoize("grades", lambda: tuple(sorted(engine.grades())))
+    dataset = current_dataset()
+    return dataset.memoize(
+        "grades",
+        lambda: tuple(
+            sorted(
+                {int(value) for value in dataset.absences["grade"].unique()}
+                | {int(value) for value in dataset.scores["grade"].unique()}
+            )
+        ),
+    )
+
+
 def list_students(grade: int | None) -> list[StudentListItem]:
     return [
         StudentListItem(id=student_id, label=f"Учень {student_id}")
@@ -110,68 +469,106 @@ def list_students(grade: int | None) -> list[StudentListItem]:
     ]
 
 
-def build_absence_items(dataframe: pd.DataFrame) -> list[AbsenceItem]:
-    items: list[AbsenceItem] = []
-    sorted_frame = dataframe.sort_values("lesson_date", ascending=False)
-    for row in sorted_frame.itertuples(index=False):
-        items.append(
-            AbsenceItem(
-                date=format_date(row.lesson_date),
-                subject=str(row.discipline_name),
-                reason=normalize_reason(row.absence_reason),
-            )
-        )
-    return items
+def format_dates(series: pd.Series) -> list[str]:
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series.dt.strftime("%Y-%m-%d").fillna("").tolist()
+    return [format_date(value) for value in series.tolist()]
 
 
-def build_score_items(dataframe: pd.DataFrame) -> list[ScoreItem]:
-    items: list[ScoreItem] = []
-    sorted_frame = dataframe.sort_values("lesson_date", ascending=False)
-    for row in sorted_frame.itertuples(index=False):
-        score_value = parse_score(row.score_numeric, row.score_text)
-        items.append(
-            ScoreItem(
-                date=format_date(row.lesson_date),
-                subject=str(row.discipline_name),
-                score=score_value,
-            )
-        )
-    return items
+def format_subjects(series: pd.Series) -> list[str]:
+    return series.astype(str).tolist()
 
 
-def select_recent_frame(
-    dataframe: pd.DataFrame,
-    date_column: str,
-    grade: int | None,
-    days: int = RECENT_DAYS,
-) -> pd.DataFrame:
-    frame = dataframe
-    if grade is not None:
-        frame = frame[frame["grade"] == grade]
-    if frame.empty:
-        return frame.iloc[0:0]
-    dates = pd.to_datetime(frame[date_column], errors="coerce")
-    max_date = dates.max()
-    if pd.isna(max_date):
-        return frame.iloc[0:0]
-    cutoff = max_date - pd.Timedelta(days=days)
-    mask = dates >= cutoff
-    return frame.loc[mask].copy()
-
-
-def add_score_values(dataframe: pd.DataFrame) -> pd.DataFrame:
-    if dataframe.empty:
-        dataframe = dataframe.copy()
-        dataframe["score_value"] = pd.Series(dtype="float64")
+def normalize_reasons(series: pd.Series) -> list[str]:
+    return series.astype("string").fillna("—").tolist()
+
+
+def scores_or_none(series: pd.Series) -> list[float | None]:
+    return series.astype(object).where(series.notna(), None).tolist()
+
+
+def lesson_dates(dataframe: pd.DataFrame) -> pd.Series:
+    return pd.to_datetime(dataframe["lesson_date"], errors="coerce")
+
+
+def select_date_range(dataframe: pd.DataFrame, window: HistoryWindow) -> pd.DataFrame:
+    if window.date_from is None and window.date_to is None and window.days is None:
         return dataframe
-    scores = dataframe.copy()
-    scores["score_value"] = [
-        parse_score(score_numeric, score_text)
-        for score_numeric, score_text in zip(
-            scores["score_numeric"], scores["score_text"]
+    # Whole days, like the compact frames and the dataset pushdown, so `to` includes its lessons.
+    dates = lesson_dates(dataframe).dt.normalize()
+    mask = np.ones(len(dataframe), dtype=bool)
+    if window.date_from is not None:
+        mask &= (dates >= pd.Timestamp(window.date_from)).to_numpy()
+    if window.date_to is not None:
+        mask &= (dates <= pd.Timestamp(window.date_to)).to_numpy()
+    if window.days is not None:
+        # Same anchor as the dashboard: the latest lesson in the selection, not today.
+        max_date = dates[mask].max()
+        if pd.isna(max_date):
+            return dataframe.iloc[0:0]
+        mask &= (dates >= max_date - pd.Timedelta(days=window.days)).to_numpy()
+    return dataframe.loc[mask]
+
+
+def select_page(
+    dataframe: pd.DataFrame,
+    limit: int | None,
+    before: date | None,
+) -> tuple[pd.DataFrame, str | None]:
+    sorted_frame = dataframe.sort_values("lesson_date", ascending=False, kind="stable")
+    if before is None and limit is None:
+        return sorted_frame, None
+    # Cursors are whole days, so compare days even when lesson_date carries a time.
+    dates = lesson_dates(sorted_frame).dt.normalize()
+    if before is not None:
+        keep = (dates < pd.Timestamp(before)).to_numpy()
+        sorted_frame = sorted_frame.loc[keep]
+        dates = dates.loc[keep]
+    if limit is None or len(sorted_frame) <= limit:
+        return sorted_frame, None
+    if limit == 0:
+        return sorted_frame.iloc[0:0], None
+    # Extend the page to the end of its last day, so a cursor never splits a date.
+    last_date = dates.iloc[limit - 1]
+    if pd.isna(last_date):
+        return sorted_frame, None
+    stop = limit + int((dates.iloc[limit:] == last_date).sum())
+    next_cursor = last_date.date().isoformat() if stop < len(sorted_frame) else None
+    return sorted_frame.iloc[:stop], next_cursor
+
+
+def summarize_absences(dataframe: pd.DataFrame) -> dict[str, Any]:
+    return {"count": len(dataframe), "average": None}
+
+
+def summarize_scores(dataframe: pd.DataFrame) -> dict[str, Any]:
+    average = dataframe["score_value"].mean()
+    return {
+        "count": len(dataframe),
+        "average": None if pd.isna(average) else round(float(average), 1),
+    }
+
+
+def build_absence_records(sorted_frame: pd.DataFrame) -> list[dict[str, Any]]:
+    return [
+        {"date": date, "subject": subject, "reason": reason}
+        for date, subject, reason in zip(
+            format_dates(sorted_frame["lesson_date"]),
+            format_subjects(sorted_frame["discipline_name"]),
+            normalize_reasons(sorted_frame["absence_reason"]),
+        )
+    ]
+
+
+def build_score_records(sorted_frame: pd.DataFrame) -> list[dict[str, Any]]:
+    return [
+        {"date": date, "subject": subject, "score": score}
+        for date, subject, score in zip(
+            format_dates(sorted_frame["lesson_date"]),
+            format_subjects(sorted_frame["discipline_name"]),
+            scores_or_none(sorted_frame["score_value"]),
         )
     ]
-    return scores[pd.notna(scores["score_value"])]
 
 
 def build_student_average_items(
@@ -194,58 +591,294 @@ def build_student_average_items(
     return items
 
 
-def get_student_data(
+def student_frames(
+    student_id: int,
+    grade: int | None,
+    subject: str | None,
+    window: HistoryWindow,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    engine = get_query_engine()
+    if engine is None:
+        dataset = current_dataset()
+        return (
+            apply_filters(dataset.absence_index, student_id, grade, subject),
+            apply_filters(dataset.score_index, student_id, grade, subject),
+        )
+    day_range = (
+        np.datetime64(window.date_from, "D") if window.date_from is not None else None,
+        np.datetime64(window.date_to, "D") if window.date_to is not None else None,
+    )
+    absences = engine.read("absences", ABSENCE_COLUMNS, student_id, grade, subject, day_range)
+    scores = engine.read("scores", SCORE_COLUMNS, student_id, grade, subject, day_range)
+    return absences, scores.assign(score_value=parse_score_values(scores))
+
+
+def batch_frames(
+    student_ids: Sequence[int],
+    grade: int | None,
+    subject: str | None,
+    window: HistoryWindow,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    engine = get_query_engine()
+    if engine is None:
+        dataset = current_dataset()
+        return (
+            filter_rows(dataset.absence_index.rows_for_many(student_ids), grade, subject),
+            filter_rows(dataset.score_index.rows_for_many(student_ids), grade, subject),
+        )
+    day_range = (
+        np.datetime64(window.date_from, "D") if window.date_from is not None else None,
+        np.datetime64(window.date_to, "D") if window.date_to is not None else None,
+    )
+    absences = engine.read(
+        "absences",
+        ABSENCE_COLUMNS,
+        grade=grade,
+        subject=subject,
+        day_range=day_range,
+        student_ids=student_ids,
+    )
+    scores = engine.read(
+        "scores",
+        SCORE_COLUMNS,
+        grade=grade,
+        subject=subject,
+        day_range=day_range,
+        student_ids=student_ids,
+    )
+    return absences, scores.assign(score_value=parse_score_values(scores))
+
+
+def group_records(
+    dataframe: pd.DataFrame,
+    build_records: Callable[[pd.DataFrame], list[dict[str, Any]]],
+) -> dict[int, list[dict[str, Any]]]:
+    # One sort and one column-wise conversion for every student, then sliced apart.
+    sorted_frame = dataframe.sort_values(
+        ["student_id", "lesson_date"], ascending=[True, False], kind="stable"
+    )
+    records = build_records(sorted_frame)
+    student_ids, starts = np.unique(sorted_frame["student_id"].to_numpy(), return_index=True)
+    stops = [*starts[1:], len(records)]
+    return {
+        int(student_id): records[start:stop]
+        for student_id, start, stop in zip(student_ids, starts, stops)
+    }
+
+
+@timed("student_batch")
+def build_batch_payload(
+    student_ids: Sequence[int],
+    grade: int | None = None,
+    subject: str | None = None,
+    window: HistoryWindow = HistoryWindow(),
+) -> dict[str, Any]:
+    trimmed_subject = subject.strip() if subject else None
+    unique_ids = list(dict.fromkeys(student_ids))
+    absences, scores = batch_frames(unique_ids, grade, trimmed_subject, window)
+    absences = select_date_range(absences, window)
+    scores = select_date_range(scores, window)
+    absence_records = group_records(absences, build_absence_records)
+    score_records = group_records(scores, build_score_records)
+    absence_counts = absences.groupby("student_id", observed=True).size()
+    score_counts = scores.groupby("student_id", observed=True).size()
+    score_averages = scores.groupby("student_id", observed=True)["score_value"].mean()
+    students = []
+    for student_id in unique_ids:
+        average = score_averages.get(student_id)
+        students.append(
+            {
+                "student_id": student_id,
+                "absences": absence_records.get(student_id, []),
+                "scores": score_records.get(student_id, []),
+                "absences_summary": {
+                    "count": int(absence_counts.get(student_id, 0)),
+                    "average": None,
+                },
+                "scores_summary": {
+                    "count": int(score_counts.get(student_id, 0)),
+                    "average": (
+                        None if average is None or pd.isna(average) else round(float(average), 1)
+                    ),
+                },
+            }
+        )
+    return {"students": students}
+
+
+def get_student_batch_json(
+    student_ids: Sequence[int],
+    grade: int | None = None,
+    subject: str | None = None,
+    window: HistoryWindow = HistoryWindow(),
+) -> bytes:
+    payload = build_batch_payload(student_ids, grade, subject, window)
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+@timed("student_history")
+def build_student_payload(
     student_id: int,
     grade: int | None = None,
     subject: str | None = None,
-) -> StudentDataResponse:
+    window: HistoryWindow = HistoryWindow(),
+) -> dict[str, Any]:
     trimmed_subject = subject.strip() if subject else None
-    absences = apply_filters(load_absences(), student_id, grade, trimmed_subject)
-    scores = apply_filters(load_scores(), student_id, grade, trimmed_subject)
-    return StudentDataResponse(
-        absences=build_absence_items(absences),
-        scores=build_score_items(scores),
+    absences, scores = student_frames(student_id, grade, trimmed_subject, window)
+    absences = select_date_range(absences, window)
+    scores = select_date_range(scores, window)
+    absences_page, absences_next = select_page(absences, window.limit, window.absences_before)
+    scores_page, scores_next = select_page(scores, window.limit, window.scores_before)
+    return {
+        "absences": build_absence_records(absences_page),
+        "scores": build_score_records(scores_page),
+        "absences_summary": summarize_absences(absences),
+        "scores_summary": summarize_scores(scores),
+        "absences_next": absences_next,
+        "scores_next": scores_next,
+    }
+
+
+def get_student_data_json(
+    student_id: int,
+    grade: int | None = None,
+    subject: str | None = None,
+    window: HistoryWindow = HistoryWindow(),
+) -> bytes:
+    # Same shape as StudentDataResponse, serialised without per-row model instances.
+    payload = build_student_payload(student_id, grade, subject, window)
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def resolve_day_range(
+    last_day: np.datetime64 | None,
+    window: OverviewWindow,
+) -> DayRange | None:
+    start = np.datetime64(window.date_from, "D") if window.date_from is not None else None
+    end = np.datetime64(window.date_to, "D") if window.date_to is not None else None
+    if window.days is not None:
+        anchor = end if end is not None else last_day
+        if anchor is None:
+            return None
+        cutoff = anchor - np.timedelta64(window.days, "D")
+        start = cutoff if start is None else max(start, cutoff)
+    return start, end
+
+
+def average_by_key(
+    rollup: DailyRollup,
+    grade: int | None,
+    day_range: DayRange | None,
+) -> pd.Series:
+    if day_range is None:
+        return pd.Series(dtype="float64")
+    counts, totals = rollup.totals_between(grade, *day_range)
+    present = counts > 0
+    return pd.Series(totals[present] / counts[present], index=rollup.keys[present])
+
+
+def count_by_key(
+    rollup: DailyRollup,
+    grade: int | None,
+    day_range: DayRange | None,
+) -> pd.Series:
+    if day_range is None:
+        return pd.Series(dtype="int64")
+    counts, _ = rollup.totals_between(grade, *day_range)
+    present = counts > 0
+    return pd.Series(counts[present].astype("int64"), index=rollup.keys[present])
+
+
+@timed("overview")
+def get_overview(
+    grade: int | None = None,
+    window: OverviewWindow = OverviewWindow(),
+) -> OverviewResponse:
+    engine = get_query_engine()
+    if engine is not None:
+        if window != OverviewWindow():
+            return query_overview(engine, grade, window)
+        return engine.memoize(("overview", grade), lambda: query_overview(engine, grade, window))
+    dataset = current_dataset()
+    if window != OverviewWindow():
+        return build_overview(dataset, grade, window)
+    return dataset.memoize(("overview", grade), lambda: build_overview(dataset, grade, window))
+
+
+def build_overview(
+    dataset: StudentDataset,
+    grade: int | None,
+    window: OverviewWindow,
+) -> OverviewResponse:
+    rollups = dataset.rollups
+    # Scores and absences each anchor `days` on their own latest lesson in the grade.
+    score_range = resolve_day_range(rollups.subject_scores.last_day(grade), window)
+    absence_range = resolve_day_range(rollups.subject_absences.last_day(grade), window)
+    return build_overview_response(
+        subject_avg=average_by_key(rollups.subject_scores, grade, score_range),
+        student_avg=average_by_key(rollups.student_scores, grade, score_range),
+        absences_counts=count_by_key(rollups.subject_absences, grade, absence_range),
     )
 
 
-@lru_cache(maxsize=6)
-def get_overview(grade: int | None = None) -> OverviewResponse:
-    recent_absences = select_recent_frame(load_absences(), "lesson_date", grade)
-    recent_scores = select_recent_frame(load_scores(), "lesson_date", grade)
-    scores_with_values = add_score_values(recent_scores)
+def select_days(dataframe: pd.DataFrame, day_range: DayRange | None) -> pd.DataFrame:
+    if day_range is None:
+        return dataframe.iloc[0:0]
+    days = lesson_dates(dataframe).dt.normalize()
+    mask = days.notna().to_numpy()
+    start, end = day_range
+    if start is not None:
+        mask &= (days >= pd.Timestamp(start)).to_numpy()
+    if end is not None:
+        mask &= (days <= pd.Timestamp(end)).to_numpy()
+    return dataframe.loc[mask]
+
+
+def query_overview(
+    engine: ParquetQueryEngine,
+    grade: int | None,
+    window: OverviewWindow,
+) -> OverviewResponse:
+    score_range = resolve_day_range(engine.last_day("scores", grade), window)
+    absence_range = resolve_day_range(engine.last_day("absences", grade), window)
+    scores = engine.read("scores", SCORE_COLUMNS, grade=grade, day_range=score_range)
+    absences = engine.read(
+        "absences", ("discipline_name", "lesson_date"), grade=grade, day_range=absence_range
+    )
+    scores = select_days(scores, score_range)
+    scores = scores.assign(score_value=parse_score_values(scores))
+    scores = scores[scores["score_value"].notna()]
+    absences = select_days(absences, absence_range)
+    return build_overview_response(
+        subject_avg=scores.groupby("discipline_name")["score_value"].mean(),
+        student_avg=scores.groupby("student_id")["score_value"].mean(),
+        absences_counts=absences.groupby("discipline_name").size(),
+    )
 
-    if scores_with_values.empty:
+
+def build_overview_response(
+    subject_avg: pd.Series,
+    student_avg: pd.Series,
+    absences_counts: pd.Series,
+) -> OverviewResponse:
+    if subject_avg.empty:
         average_scores: list[SubjectAverage] = []
         top_students: list[StudentAverage] = []
         bottom_students: list[StudentAverage] = []
     else:
-        subject_avg = (
-            scores_with_values.groupby("discipline_name")["score_value"]
-            .mean()
-            .sort_values(ascending=False)
-        )
         average_scores = [
             SubjectAverage(subject=str(subject), average=round(float(avg), 1))
-            for subject, avg in subject_avg.items()
+            for subject, avg in subject_avg.sort_values(ascending=False).items()
         ]
-        student_avg = scores_with_values.groupby("student_id")["score_value"].mean()
         top_students = build_student_average_items(student_avg, limit=3, ascending=False)
         bottom_students = build_student_average_items(
             student_avg, limit=3, ascending=True
         )
 
-    if recent_absences.empty:
-        absences_by_subject: list[SubjectCount] = []
-    else:
-        absences_counts = (
-            recent_absences.groupby("discipline_name")["student_id"]
-            .count()
-            .sort_values(ascending=False)
-        )
-        absences_by_subject = [
-            SubjectCount(subject=str(subject), count=int(count))
-            for subject, count in absences_counts.items()
-        ]
+    absences_by_subject = [
+        SubjectCount(subject=str(subject), count=int(count))
+        for subject, count in absences_counts.sort_values(ascending=False).items()
+    ]
 
     return OverviewResponse(
         average_scores=average_scores,
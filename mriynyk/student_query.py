@@ -0,0 +1,112 @@
+from pathlib import Path
+from typing import Any, Callable, Hashable, Sequence, TypeVar
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from mriynyk.data_version import file_version
+
+T = TypeVar("T")
+
+DayRange = tuple[np.datetime64 | None, np.datetime64 | None]
+
+
+def date_bound(field_type: pa.DataType, day: np.datetime64) -> pa.Scalar | None:
+    if pa.types.is_timestamp(field_type) and field_type.tz is None:
+        return pa.scalar(pd.Timestamp(day).to_pydatetime(), type=field_type)
+    if pa.types.is_date(field_type):
+        return pa.scalar(pd.Timestamp(day).date(), type=field_type)
+    if pa.types.is_string(field_type) or pa.types.is_large_string(field_type):
+        # ISO dates (with or without a time part) order correctly as text.
+        return pa.scalar(str(day), type=field_type)
+    return None
+
+
+def date_filter(schema: pa.Schema, day_range: DayRange) -> ds.Expression | None:
+    field_type = schema.field("lesson_date").type
+    start, end = day_range
+    expression = None
+    if start is not None:
+        bound = date_bound(field_type, start)
+        if bound is not None:
+            expression = pc.field("lesson_date") >= bound
+    if end is not None:
+        bound = date_bound(field_type, end + np.timedelta64(1, "D"))
+        if bound is not None:
+            upper = pc.field("lesson_date") < bound
+            expression = upper if expression is None else expression & upper
+    return expression
+
+
+class ParquetQueryEngine:
+    def __init__(self, paths: dict[str, Path]) -> None:
+        self._paths = paths
+        self._memo_version: str | None = None
+        self._memo: dict[Hashable, Any] = {}
+
+    @property
+    def version(self) -> str:
+        return file_version(tuple(self._paths.values()))
+
+    def memoize(self, key: Hashable, compute: Callable[[], T]) -> T:
+        version = self.version
+        if version != self._memo_version:
+            self._memo = {}
+            self._memo_version = version
+        if key not in self._memo:
+            self._memo[key] = compute()
+        return self._memo[key]
+
+    def read(
+        self,
+        name: str,
+        columns: Sequence[str],
+        student_id: int | None = None,
+        grade: int | None = None,
+        subject: str | None = None,
+        day_range: DayRange | None = None,
+        student_ids: Sequence[int] | None = None,
+    ) -> pd.DataFrame:
+        # Re-discovered per query, so a new export is picked up without a reload step.
+        dataset = ds.dataset(self._paths[name], format="parquet")
+        filters = []
+        if student_id is not None:
+            filters.append(pc.field("student_id") == student_id)
+        if student_ids is not None:
+            filters.append(pc.field("student_id").isin(list(student_ids)))
+        if grade is not None:
+            filters.append(pc.field("grade") == grade)
+        if subject:
+            filters.append(pc.field("discipline_name") == subject)
+        if day_range is not None:
+            expression = date_filter(dataset.schema, day_range)
+            if expression is not None:
+                filters.append(expression)
+        expression = None
+        for condition in filters:
+            expression = condition if expression is None else expression & condition
+        return dataset.to_table(columns=list(columns), filter=expression).to_pandas()
+
+    def student_ids(self, grade: int | None) -> set[int]:
+        student_ids: set[int] = set()
+        for name in self._paths:
+            frame = self.read(name, ["student_id"], grade=grade)
+            student_ids.update(int(value) for value in frame["student_id"].unique())
+        return student_ids
+
+    def grades(self) -> set[int]:
+        grades: set[int] = set()
+        for name in self._paths:
+            frame = self.read(name, ["grade"])
+            grades.update(int(value) for value in frame["grade"].dropna().unique())
+        return grades
+
+    def last_day(self, name: str, grade: int | None) -> np.datetime64 | None:
+        frame = self.read(name, ["lesson_date"], grade=grade)
+        last_date = pd.to_datetime(frame["lesson_date"], errors="coerce").max()
+        if pd.isna(last_date):
+            return None
+        return np.datetime64(last_date.normalize(), "D")
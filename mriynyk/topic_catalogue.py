@@ -0,0 +1,126 @@
+import asyncio
+import logging
+import time
+from functools import lru_cache
+from typing import Any
+
+from psycopg import errors, sql
+
+from mriynyk.config import (
+    DEFAULT_DISCIPLINE_COLUMN,
+    DEFAULT_GRADE_COLUMN,
+    DEFAULT_SCHEMA_NAME,
+    DEFAULT_TABLE_NAME,
+    DEFAULT_TOPIC_CATALOGUE_TABLE_NAME,
+    TOPIC_CATALOGUE_CHECK_ENV_VAR,
+    DEFAULT_TOPIC_CATALOGUE_CHECK_SECONDS,
+    resolve_positive_float,
+)
+from mriynyk.db import get_connection_pool
+from mriynyk.models import DisciplineName
+
+logger = logging.getLogger(__name__)
+
+CatalogueKey = tuple[int, DisciplineName]
+
+CATALOGUE_VERSION_SQL = sql.SQL("SELECT max(refreshed_at) FROM {}.{}").format(
+    sql.Identifier(DEFAULT_SCHEMA_NAME),
+    sql.Identifier(DEFAULT_TOPIC_CATALOGUE_TABLE_NAME),
+)
+
+CATALOGUE_TOPICS_SQL = sql.SQL(
+    "SELECT {} FROM {}.{} WHERE {} = %s AND {} = %s ORDER BY {}"
+).format(
+    sql.Identifier("topic_title"),
+    sql.Identifier(DEFAULT_SCHEMA_NAME),
+    sql.Identifier(DEFAULT_TOPIC_CATALOGUE_TABLE_NAME),
+    sql.Identifier(DEFAULT_GRADE_COLUMN),
+    sql.Identifier(DEFAULT_DISCIPLINE_COLUMN),
+    sql.Identifier("topic_title"),
+)
+
+# Used until the loader has materialised the catalogue table.
+UNIQUE_TOPICS_SQL = sql.SQL("SELECT DISTINCT {} FROM {}.{} WHERE {} = %s AND {} = %s").format(
+    sql.Identifier("topic_title"),
+    sql.Identifier(DEFAULT_SCHEMA_NAME),
+    sql.Identifier(DEFAULT_TABLE_NAME),
+    sql.Identifier(DEFAULT_GRADE_COLUMN),
+    sql.Identifier(DEFAULT_DISCIPLINE_COLUMN),
+)
+
+
+class TopicCatalogue:
+    def __init__(self, check_interval_seconds: float) -> None:
+        self._check_interval_seconds = check_interval_seconds
+        self._topics: dict[CatalogueKey, tuple[str, ...]] = {}
+        self._version: Any = None
+        self._checked_at = float("-inf")
+        self._lock = asyncio.Lock()
+
+    async def topics(
+        self,
+        database_url: str,
+        grade_value: int,
+        discipline_name: DisciplineName,
+    ) -> tuple[str, ...]:
+        key = (grade_value, discipline_name)
+        if time.monotonic() - self._checked_at >= self._check_interval_seconds:
+            await self._refresh_version(database_url)
+        cached = self._topics.get(key)
+        if cached is not None:
+            return cached
+        async with self._lock:
+            cached = self._topics.get(key)
+            if cached is None:
+                cached = await self._load_topics(database_url, grade_value, discipline_name)
+                if cached:
+                    self._topics[key] = cached
+        return cached
+
+    def invalidate(self) -> None:
+        self._topics.clear()
+        self._checked_at = float("-inf")
+
+    async def _refresh_version(self, database_url: str) -> None:
+        async with self._lock:
+            if time.monotonic() - self._checked_at < self._check_interval_seconds:
+                return
+            pool = await get_connection_pool(database_url)
+            try:
+                async with pool.connection() as connection:
+                    cursor = await connection.execute(CATALOGUE_VERSION_SQL, prepare=True)
+                    row = await cursor.fetchone()
+                version = row[0] if row else None
+            except errors.UndefinedTable:
+                version = None
+            if version != self._version:
+                logger.info("Topic catalogue version changed to %s", version)
+                self._topics.clear()
+                self._version = version
+            self._checked_at = time.monotonic()
+
+    async def _load_topics(
+        self,
+        database_url: str,
+        grade_value: int,
+        discipline_name: DisciplineName,
+    ) -> tuple[str, ...]:
+        query = CATALOGUE_TOPICS_SQL if self._version is not None else UNIQUE_TOPICS_SQL
+        pool = await get_connection_pool(database_url)
+        async with pool.connection() as connection:
+            cursor = await connection.execute(
+                query,
+                (grade_value, discipline_name),
+                prepare=True,
+            )
+            rows = await cursor.fetchall()
+        return tuple(row[0] for row in rows)
+
+
+@lru_cache(maxsize=1)
+def get_topic_catalogue() -> TopicCatalogue:
+    return TopicCatalogue(
+        resolve_positive_float(
+            TOPIC_CATALOGUE_CHECK_ENV_VAR, DEFAULT_TOPIC_CATALOGUE_CHECK_SECONDS
+        )
+    )
@@ -0,0 +1,170 @@
+import logging
+import math
+import re
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from functools import lru_cache
+from typing import Sequence
+
+from mriynyk.config import (
+    TopicMatchSettings,
+    resolve_topic_match_settings,
+)
+from mriynyk.llm import embed_texts
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"[\w']+")
+APOSTROPHES = str.maketrans({"’": "'", "ʼ": "'", "`": "'"})
+STEM_LENGTH = 5
+MAX_CACHED_INDEXES = 64
+
+
+@dataclass(frozen=True)
+class TopicMatch:
+    title: str
+    score: float
+    margin: float
+    method: str
+
+
+@dataclass(frozen=True)
+class TopicIndex:
+    titles: tuple[str, ...]
+    normalized_titles: tuple[str, ...]
+    trigrams: tuple[frozenset[str], ...]
+    stems: tuple[frozenset[str], ...]
+    embeddings: tuple[tuple[float, ...], ...] | None
+
+    def match_lexical(self, topic: str) -> TopicMatch:
+        normalized = normalize_text(topic)
+        query_trigrams = char_trigrams(normalized)
+        query_stems = token_stems(normalized)
+        scores: list[float] = []
+        for title, trigrams, stems in zip(self.normalized_titles, self.trigrams, self.stems):
+            if title == normalized:
+                scores.append(1.0)
+                continue
+            trigram_score = dice(query_trigrams, trigrams)
+            coverage = len(query_stems & stems) / len(query_stems) if query_stems else 0.0
+            scores.append(0.5 * trigram_score + 0.5 * coverage)
+        match = self._best(scores, "lexical")
+        if normalized in self.normalized_titles:
+            # An exact title is unambiguous even when a longer title contains it.
+            exact_title = self.titles[self.normalized_titles.index(normalized)]
+            return replace(match, title=exact_title, method="exact")
+        return match
+
+    def match_vector(self, vector: Sequence[float]) -> TopicMatch:
+        if self.embeddings is None:
+            raise ValueError("Topic index was built without embeddings.")
+        query_norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+        scores = [
+            sum(a * b for a, b in zip(vector, embedding)) / query_norm
+            for embedding in self.embeddings
+        ]
+        return self._best(scores, "embedding")
+
+    def _best(self, scores: list[float], method: str) -> TopicMatch:
+        ranked = sorted(range(len(scores)), key=scores.__getitem__, reverse=True)
+        best_score = scores[ranked[0]]
+        runner_up = scores[ranked[1]] if len(ranked) > 1 else 0.0
+        return TopicMatch(
+            title=self.titles[ranked[0]],
+            score=best_score,
+            margin=best_score - runner_up,
+            method=method,
+        )
+
+
+def normalize_text(value: str) -> str:
+    return " ".join(TOKEN_PATTERN.findall(value.lower().translate(APOSTROPHES)))
+
+
+def char_trigrams(normalized: str) -> frozenset[str]:
+    padded = f"  {normalized} "
+    return frozenset(padded[index : index + 3] for index in range(len(padded) - 2))
+
+
+def stem_tokens(normalized: str) -> list[str]:
+    # Ukrainian is highly inflected, so a fixed-length prefix stands in for a stemmer.
+    return [token[:STEM_LENGTH] for token in normalized.split() if len(token) > 2]
+
+
+def token_stems(normalized: str) -> frozenset[str]:
+    return frozenset(stem_tokens(normalized))
+
+
+def dice(left: frozenset[str], right: frozenset[str]) -> float:
+    if not left or not right:
+        return 0.0
+    return 2 * len(left & right) / (len(left) + len(right))
+
+
+def unit_vector(vector: Sequence[float]) -> tuple[float, ...]:
+    norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+    return tuple(value / norm for value in vector)
+
+
+def is_confident(match: TopicMatch, min_score: float, min_margin: float) -> bool:
+    return match.method == "exact" or (match.score >= min_score and match.margin >= min_margin)
+
+
+async def build_topic_index(titles: Sequence[str], with_embeddings: bool) -> TopicIndex:
+    normalized_titles = tuple(normalize_text(title) for title in titles)
+    embeddings = None
+    if with_embeddings:
+        try:
+            embeddings = tuple(unit_vector(vector) for vector in await embed_texts(titles))
+        except Exception:
+            logger.warning("Embedding topic titles failed; lexical matching only", exc_info=True)
+    return TopicIndex(
+        titles=tuple(titles),
+        normalized_titles=normalized_titles,
+        trigrams=tuple(char_trigrams(title) for title in normalized_titles),
+        stems=tuple(token_stems(title) for title in normalized_titles),
+        embeddings=embeddings,
+    )
+
+
+class TopicMatcher:
+    def __init__(self, settings: TopicMatchSettings) -> None:
+        self._settings = settings
+        self._indexes: OrderedDict[tuple[str, ...], TopicIndex] = OrderedDict()
+
+    async def index_for(self, titles: Sequence[str]) -> TopicIndex:
+        key = tuple(titles)
+        index = self._indexes.get(key)
+        if index is None:
+            index = await build_topic_index(key, self._settings.embeddings_enabled)
+            self._indexes[key] = index
+            while len(self._indexes) > MAX_CACHED_INDEXES:
+                self._indexes.popitem(last=False)
+        else:
+            self._indexes.move_to_end(key)
+        return index
+
+    async def match(self, topic: str, titles: Sequence[str]) -> tuple[TopicMatch, bool]:
+        index = await self.index_for(titles)
+        match = index.match_lexical(topic)
+        if is_confident(match, self._settings.min_score, self._settings.min_margin):
+            return match, True
+        if index.embeddings is None:
+            return match, False
+        try:
+            vector = (await embed_texts([topic]))[0]
+        except Exception:
+            logger.warning("Embedding the topic request failed", exc_info=True)
+            return match, False
+        vector_match = index.match_vector(vector)
+        confident = is_confident(
+            vector_match,
+            self._settings.min_similarity,
+            self._settings.min_similarity_margin,
+        )
+        return (vector_match, True) if confident else (match, False)
+
+
+@lru_cache(maxsize=1)
+def get_topic_matcher() -> TopicMatcher:
+    return TopicMatcher(resolve_topic_match_settings())
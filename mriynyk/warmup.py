@@ -0,0 +1,123 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable
+
+from mriynyk.config import resolve_database_url
+from mriynyk.db import get_connection_pool
+from mriynyk.jobs import get_answer_jobs
+from mriynyk.llm import LlmProvider, get_async_llm_client
+from mriynyk.prompts import compile_prompts
+from mriynyk.student_data import get_overview, list_grades, list_student_ids
+
+logger = logging.getLogger(__name__)
+
+OPTIONAL_STEP_TIMEOUT_SECONDS = 10.0
+
+
+@dataclass
+class WarmupStep:
+    name: str
+    required: bool
+    status: str = "pending"
+    seconds: float | None = None
+    error: str | None = None
+
+
+@dataclass
+class WarmupState:
+    steps: list[WarmupStep] = field(default_factory=list)
+    finished: bool = False
+
+    @property
+    def ready(self) -> bool:
+        # Optional steps may still be running or have failed; they never hold readiness back.
+        required = [step for step in self.steps if step.required]
+        return bool(required) and all(step.status == "ok" for step in required)
+
+    def as_dict(self) -> dict[str, object]:
+        return {
+            "ready": self.ready,
+            "finished": self.finished,
+            "steps": [
+                {
+                    "name": step.name,
+                    "required": step.required,
+                    "status": step.status,
+                    "seconds": step.seconds,
+                    "error": step.error,
+                }
+                for step in self.steps
+            ],
+        }
+
+
+def warm_student_data() -> None:
+    for grade in (None, *list_grades()):
+        list_student_ids(grade)
+        get_overview(grade)
+
+
+async def warm_database() -> None:
+    pool = await get_connection_pool(resolve_database_url(None))
+    await pool.wait()
+
+
+async def warm_llm_clients() -> None:
+    # Listing models opens (and keeps alive) one connection per provider.
+    await asyncio.gather(
+        *(
+            get_async_llm_client(provider)
+            .with_options(timeout=OPTIONAL_STEP_TIMEOUT_SECONDS, max_retries=0)
+            .models.list()
+            for provider in LlmProvider
+        )
+    )
+
+
+async def run_step(step: WarmupStep, action: Callable[[], Awaitable[None]]) -> None:
+    started = time.perf_counter()
+    step.status = "running"
+    try:
+        await action()
+    except Exception as exc:
+        step.status = "failed"
+        step.error = f"{type(exc).__name__}: {exc}" if str(exc) else type(exc).__name__
+        log = logger.error if step.required else logger.warning
+        log("Warm-up step %s failed", step.name, exc_info=True)
+    else:
+        step.status = "ok"
+    step.seconds = round(time.perf_counter() - started, 3)
+
+
+def with_timeout(action: Callable[[], Awaitable[None]]) -> Callable[[], Awaitable[None]]:
+    return lambda: asyncio.wait_for(action(), OPTIONAL_STEP_TIMEOUT_SECONDS)
+
+
+async def warm_up(state: WarmupState) -> None:
+    required: list[tuple[WarmupStep, Callable[[], Awaitable[None]]]] = [
+        (WarmupStep("prompts", required=True), lambda: asyncio.to_thread(compile_prompts)),
+        (
+            WarmupStep("student_data", required=True),
+            lambda: asyncio.to_thread(warm_student_data),
+        ),
+    ]
+    optional: list[tuple[WarmupStep, Callable[[], Awaitable[None]]]] = [
+        (WarmupStep("database", required=False), with_timeout(warm_database)),
+        (WarmupStep("llm_clients", required=False), with_timeout(warm_llm_clients)),
+        (
+            WarmupStep("answer_jobs", required=False),
+            with_timeout(lambda: get_answer_jobs().clean_up_table()),
+        ),
+    ]
+    state.steps = [step for step, _ in required + optional]
+    optional_steps = asyncio.gather(*(run_step(step, action) for step, action in optional))
+    for step, action in required:
+        await run_step(step, action)
+    await optional_steps
+    state.finished = True
+    logger.info("Warm-up finished, ready=%s", state.ready)
+
+
+WARMUP_STATE = WarmupState()
@@ -0,0 +1,243 @@
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+
+from psycopg import AsyncConnection, sql
+from psycopg.types.json import Jsonb
+
+from mriynyk.config import (
+    DEFAULT_SCHEMA_NAME,
+    WORKBOOK_CACHE_TABLE_NAME,
+    WorkbookCacheSettings,
+    resolve_database_url,
+    resolve_workbook_cache_settings,
+)
+from mriynyk.db import get_connection_pool
+from mriynyk.models import Workbook
+
+logger = logging.getLogger(__name__)
+
+CREATE_TABLE_SQL = sql.SQL(
+    "CREATE TABLE IF NOT EXISTS {}.{} ("
+    "cache_key text PRIMARY KEY, "
+    "grade integer NOT NULL, "
+    "discipline text NOT NULL, "
+    "topic_title text NOT NULL, "
+    "workbook jsonb NOT NULL, "
+    "expires_at timestamptz NOT NULL)"
+).format(sql.Identifier(DEFAULT_SCHEMA_NAME), sql.Identifier(WORKBOOK_CACHE_TABLE_NAME))
+
+SELECT_SQL = sql.SQL(
+    "SELECT workbook, extract(epoch FROM expires_at - now()) FROM {}.{} "
+    "WHERE cache_key = %s AND expires_at > now()"
+).format(sql.Identifier(DEFAULT_SCHEMA_NAME), sql.Identifier(WORKBOOK_CACHE_TABLE_NAME))
+
+UPSERT_SQL = sql.SQL(
+    "INSERT INTO {}.{} (cache_key, grade, discipline, topic_title, workbook, expires_at) "
+    "VALUES (%s, %s, %s, %s, %s, now() + make_interval(secs => %s)) "
+    "ON CONFLICT (cache_key) DO UPDATE SET workbook = EXCLUDED.workbook, "
+    "expires_at = EXCLUDED.expires_at"
+).format(sql.Identifier(DEFAULT_SCHEMA_NAME), sql.Identifier(WORKBOOK_CACHE_TABLE_NAME))
+
+DELETE_SQL = sql.SQL(
+    "DELETE FROM {}.{} WHERE (%(grade)s::integer IS NULL OR grade = %(grade)s) "
+    "AND (%(discipline)s::text IS NULL OR discipline = %(discipline)s) "
+    "AND (%(topic_title)s::text IS NULL OR topic_title = %(topic_title)s)"
+).format(sql.Identifier(DEFAULT_SCHEMA_NAME), sql.Identifier(WORKBOOK_CACHE_TABLE_NAME))
+
+
+@dataclass(frozen=True)
+class WorkbookCacheKey:
+    model: str
+    grade: int
+    discipline: str
+    topic_title: str
+    student_info: str
+    retrieval: str = "topic"
+
+    @property
+    def digest(self) -> str:
+        payload = json.dumps(
+            [
+                self.model,
+                self.grade,
+                self.discipline,
+                self.topic_title,
+                self.student_info.strip(),
+                self.retrieval,
+            ],
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def matches(
+        self,
+        grade: int | None,
+        discipline: str | None,
+        topic_title: str | None,
+    ) -> bool:
+        return (
+            (grade is None or self.grade == grade)
+            and (discipline is None or self.discipline == discipline)
+            and (topic_title is None or self.topic_title == topic_title)
+        )
+
+
+@dataclass
+class _CacheEntry:
+    key: WorkbookCacheKey
+    workbook: Workbook
+    expires_at: float
+
+
+class WorkbookCache:
+    def __init__(self, settings: WorkbookCacheSettings) -> None:
+        self._settings = settings
+        self._entries: OrderedDict[str, _CacheEntry] = OrderedDict()
+        self._table_ready = False
+        self._counters = {
+            "memory_hits": 0,
+            "postgres_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "invalidated": 0,
+            "postgres_errors": 0,
+        }
+
+    async def get(self, key: WorkbookCacheKey) -> Workbook | None:
+        digest = key.digest
+        entry = self._entries.get(digest)
+        if entry is not None:
+            if entry.expires_at > time.monotonic():
+                self._entries.move_to_end(digest)
+                self._counters["memory_hits"] += 1
+                return entry.workbook
+            del self._entries[digest]
+
+        if self._settings.postgres_enabled:
+            stored = await self._load_from_postgres(digest)
+            if stored is not None:
+                workbook, ttl_seconds = stored
+                self._remember(key, workbook, ttl_seconds)
+                self._counters["postgres_hits"] += 1
+                return workbook
+
+        self._counters["misses"] += 1
+        return None
+
+    async def put(self, key: WorkbookCacheKey, workbook: Workbook) -> None:
+        self._remember(key, workbook, self._settings.ttl_seconds)
+        self._counters["stores"] += 1
+        if self._settings.postgres_enabled:
+            await self._store_in_postgres(key, workbook)
+
+    async def invalidate(
+        self,
+        grade: int | None = None,
+        discipline: str | None = None,
+        topic_title: str | None = None,
+    ) -> int:
+        stale_digests = [
+            digest
+            for digest, entry in self._entries.items()
+            if entry.key.matches(grade, discipline, topic_title)
+        ]
+        for digest in stale_digests:
+            del self._entries[digest]
+        removed = len(stale_digests)
+        if self._settings.postgres_enabled:
+            removed = max(
+                removed, await self._delete_from_postgres(grade, discipline, topic_title)
+            )
+        self._counters["invalidated"] += removed
+        return removed
+
+    def stats(self) -> dict[str, int]:
+        return {
+            **self._counters,
+            "entries": len(self._entries),
+            "max_entries": self._settings.max_entries,
+        }
+
+    def _remember(self, key: WorkbookCacheKey, workbook: Workbook, ttl_seconds: float) -> None:
+        digest = key.digest
+        self._entries[digest] = _CacheEntry(
+            key=key,
+            workbook=workbook,
+            expires_at=time.monotonic() + ttl_seconds,
+        )
+        self._entries.move_to_end(digest)
+        while len(self._entries) > self._settings.max_entries:
+            self._entries.popitem(last=False)
+
+    async def _ensure_table(self, connection: AsyncConnection) -> None:
+        if self._table_ready:
+            return
+        await connection.execute(CREATE_TABLE_SQL)
+        self._table_ready = True
+
+    async def _load_from_postgres(self, digest: str) -> tuple[Workbook, float] | None:
+        try:
+            pool = await get_connection_pool(resolve_database_url(None))
+            async with pool.connection() as connection:
+                await self._ensure_table(connection)
+                cursor = await connection.execute(SELECT_SQL, (digest,), prepare=True)
+                row = await cursor.fetchone()
+        except Exception:
+            logger.warning("Workbook cache lookup in Postgres failed", exc_info=True)
+            self._counters["postgres_errors"] += 1
+            return None
+        if row is None:
+            return None
+        payload, ttl_seconds = row
+        return Workbook.model_validate(payload), float(ttl_seconds)
+
+    async def _store_in_postgres(self, key: WorkbookCacheKey, workbook: Workbook) -> None:
+        try:
+            pool = await get_connection_pool(resolve_database_url(None))
+            async with pool.connection() as connection:
+                await self._ensure_table(connection)
+                await connection.execute(
+                    UPSERT_SQL,
+                    (
+                        key.digest,
+                        key.grade,
+                        key.discipline,
+                        key.topic_title,
+                        Jsonb(workbook.model_dump()),
+                        self._settings.ttl_seconds,
+                    ),
+                    prepare=True,
+                )
+        except Exception:
+            logger.warning("Workbook cache write to Postgres failed", exc_info=True)
+            self._counters["postgres_errors"] += 1
+
+    async def _delete_from_postgres(
+        self,
+        grade: int | None,
+        discipline: str | None,
+        topic_title: str | None,
+    ) -> int:
+        try:
+            pool = await get_connection_pool(resolve_database_url(None))
+            async with pool.connection() as connection:
+                await self._ensure_table(connection)
+                cursor = await connection.execute(
+                    DELETE_SQL,
+                    {"grade": grade, "discipline": discipline, "topic_title": topic_title},
+                )
+        except Exception:
+            logger.warning("Workbook cache invalidation in Postgres failed", exc_info=True)
+            self._counters["postgres_errors"] += 1
+            return 0
+        return cursor.rowcount
+
+
+@lru_cache(maxsize=1)
+def get_workbook_cache() -> WorkbookCache:
+    return WorkbookCache(resolve_workbook_cache_settings())
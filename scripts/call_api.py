@@ -6,6 +6,7 @@ import json
 import os
 from pathlib import Path
 import sys
+import time
 from typing import Any, Final, TypedDict
 from urllib.error import HTTPError, URLError
 from urllib.request import Request, urlopen
@@ -21,6 +22,9 @@ API_URL_ENV_VAR: Final[str] = "API_URL"
 DEFAULT_API_URL: Final[str] = "http://localhost:8000/answer"
 REQUEST_TIMEOUT_ENV_VAR: Final[str] = "API_TIMEOUT_SECONDS"
 DEFAULT_REQUEST_TIMEOUT_SECONDS: Final[float] = 120.0
+JOB_WAIT_SECONDS: Final[int] = 30
+JOB_DEADLINE_ENV_VAR: Final[str] = "API_JOB_DEADLINE_SECONDS"
+DEFAULT_JOB_DEADLINE_SECONDS: Final[float] = 900.0
 
 
 class AnswerRequest(TypedDict):
@@ -40,6 +44,7 @@ class CommandLineArguments:
     subject: Subject
     topic: str
     student_info: str
+    job: bool
 
 
 def build_parser() -> ArgumentParser:
@@ -70,6 +75,11 @@ def build_parser() -> ArgumentParser:
         type=str,
         help="Student context to personalize the response.",
     )
+    parser.add_argument(
+        "--job",
+        action="store_true",
+        help="Submit an answer job and poll for it instead of waiting on one request.",
+    )
     return parser
 
 
@@ -81,6 +91,7 @@ def parse_args() -> CommandLineArguments:
         subject=parsed_args.subject,
         topic=parsed_args.topic,
         student_info=parsed_args.student_info,
+        job=parsed_args.job,
     )
 
 
@@ -93,23 +104,26 @@ def build_request_payload(arguments: CommandLineArguments) -> AnswerRequest:
     }
 
 
-def resolve_request_timeout_seconds() -> float:
-    raw_timeout = os.environ.get(REQUEST_TIMEOUT_ENV_VAR)
+def resolve_seconds(env_name: str, default: float) -> float:
+    raw_timeout = os.environ.get(env_name)
     if raw_timeout is None:
-        return DEFAULT_REQUEST_TIMEOUT_SECONDS
+        return default
     try:
         timeout = float(raw_timeout)
     except ValueError as exc:
         raise ValueError(
-            f"{REQUEST_TIMEOUT_ENV_VAR} must be a positive number."
+            f"{env_name} must be a positive number."
         ) from exc
     if timeout <= 0:
-        raise ValueError(f"{REQUEST_TIMEOUT_ENV_VAR} must be a positive number.")
+        raise ValueError(f"{env_name} must be a positive number.")
     return timeout
 
 
-def load_response_payload(response_body: str) -> AnswerResponse:
-    parsed_body: Any = json.loads(response_body)
+def resolve_request_timeout_seconds() -> float:
+    return resolve_seconds(REQUEST_TIMEOUT_ENV_VAR, DEFAULT_REQUEST_TIMEOUT_SECONDS)
+
+
+def load_response_payload(parsed_body: Any) -> AnswerResponse:
     if not isinstance(parsed_body, dict):
         raise ValueError("Unexpected response payload.")
     result = parsed_body.get("result")
@@ -118,18 +132,7 @@ def load_response_payload(response_body: str) -> AnswerResponse:
     return {"result": result}
 
 
-def post_json(
-    api_url: str,
-    payload: AnswerRequest,
-    timeout_seconds: float,
-) -> AnswerResponse:
-    request_body = json.dumps(payload).encode("utf-8")
-    request = Request(
-        api_url,
-        data=request_body,
-        headers={"Content-Type": "application/json"},
-        method="POST",
-    )
+def send_request(request: Request, timeout_seconds: float) -> Any:
     try:
         with urlopen(request, timeout=timeout_seconds) as response:
             response_body = response.read().decode("utf-8")
@@ -137,7 +140,7 @@ def post_json(
         raise RuntimeError(
             "API request timed out after "
             f"{timeout_seconds:.0f}s. "
-            f"Set {REQUEST_TIMEOUT_ENV_VAR} to a higher value."
+            f"Set {REQUEST_TIMEOUT_ENV_VAR} to a higher value or use --job."
         ) from exc
     except HTTPError as exc:
         error_body = exc.read().decode("utf-8")
@@ -146,7 +149,48 @@ def post_json(
         ) from exc
     except URLError as exc:
         raise RuntimeError(f"API request failed: {exc.reason}") from exc
-    return load_response_payload(response_body)
+    return json.loads(response_body)
+
+
+def build_post_request(url: str, payload: AnswerRequest) -> Request:
+    return Request(
+        url,
+        data=json.dumps(payload).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+
+
+def post_json(
+    api_url: str,
+    payload: AnswerRequest,
+    timeout_seconds: float,
+) -> AnswerResponse:
+    parsed_body = send_request(build_post_request(api_url, payload), timeout_seconds)
+    return load_response_payload(parsed_body)
+
+
+def run_job(
+    api_url: str,
+    payload: AnswerRequest,
+    timeout_seconds: float,
+    deadline_seconds: float,
+) -> AnswerResponse:
+    deadline = time.monotonic() + deadline_seconds
+    base_url = api_url.removesuffix("/answer")
+    job = send_request(build_post_request(f"{base_url}/jobs/answer", payload), timeout_seconds)
+    job_url = f"{base_url}/jobs/{job['job_id']}?wait={JOB_WAIT_SECONDS}"
+    # Each poll is held open by the server for up to JOB_WAIT_SECONDS.
+    while job["status"] not in ("succeeded", "failed"):
+        if time.monotonic() >= deadline:
+            raise RuntimeError(
+                f"Answer job {job['job_id']} did not finish within {deadline_seconds:.0f}s. "
+                f"Set {JOB_DEADLINE_ENV_VAR} to wait longer."
+            )
+        job = send_request(Request(job_url), JOB_WAIT_SECONDS + timeout_seconds)
+    if job["status"] == "failed":
+        raise RuntimeError(f"Answer job failed: {job['error']}")
+    return load_response_payload(job["result"])
 
 
 def main() -> int:
@@ -154,7 +198,15 @@ def main() -> int:
     api_url = os.environ.get(API_URL_ENV_VAR, DEFAULT_API_URL)
     payload = build_request_payload(arguments)
     timeout_seconds = resolve_request_timeout_seconds()
-    response = post_json(api_url, payload, timeout_seconds)
+    if arguments.job:
+        response = run_job(
+            api_url,
+            payload,
+            timeout_seconds,
+            resolve_seconds(JOB_DEADLINE_ENV_VAR, DEFAULT_JOB_DEADLINE_SECONDS),
+        )
+    else:
+        response = post_json(api_url, payload, timeout_seconds)
     print(response["result"])
     return 0
 
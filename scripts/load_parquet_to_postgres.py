@@ -26,6 +26,10 @@ class LoadConfig:
     table_name: str
     vector_column: str
     index_name: str
+    topic_catalogue_table: str
+    grade_column: str
+    discipline_column: str
+    topic_column: str
     hnsw_m: int
     hnsw_ef_construction: int
     ivfflat_lists: int
@@ -45,6 +49,10 @@ def parse_args() -> LoadConfig:
     parser.add_argument("--table-name", default="pages_for_hackathon")
     parser.add_argument("--vector-column", default="page_text_embedding")
     parser.add_argument("--index-name", default="pages_for_hackathon_embedding_idx")
+    parser.add_argument("--topic-catalogue-table", default="pages_for_hackathon_topics")
+    parser.add_argument("--grade-column", default="grade")
+    parser.add_argument("--discipline-column", default="global_discipline_name")
+    parser.add_argument("--topic-column", default="topic_title")
     parser.add_argument("--hnsw-m", default=16, type=int)
     parser.add_argument("--hnsw-ef-construction", default=64, type=int)
     parser.add_argument("--ivfflat-lists", default=100, type=int)
@@ -61,6 +69,10 @@ def parse_args() -> LoadConfig:
         table_name=args.table_name,
         vector_column=args.vector_column,
         index_name=args.index_name,
+        topic_catalogue_table=args.topic_catalogue_table,
+        grade_column=args.grade_column,
+        discipline_column=args.discipline_column,
+        topic_column=args.topic_column,
         hnsw_m=args.hnsw_m,
         hnsw_ef_construction=args.hnsw_ef_construction,
         ivfflat_lists=args.ivfflat_lists,
@@ -212,6 +224,40 @@ def build_index_sql(
     )
 
 
+def build_topic_catalogue_sql(
+    schema_name: str,
+    table_name: str,
+    catalogue_table: str,
+    grade_column: str,
+    discipline_column: str,
+    topic_column: str,
+) -> list[sql.Composed]:
+    catalogue = sql.SQL("{}.{}").format(
+        sql.Identifier(schema_name),
+        sql.Identifier(catalogue_table),
+    )
+    return [
+        sql.SQL("DROP TABLE IF EXISTS {}").format(catalogue),
+        sql.SQL(
+            "CREATE TABLE {} AS SELECT DISTINCT {}, {}, {}, now() AS refreshed_at "
+            "FROM {}.{} WHERE {} IS NOT NULL"
+        ).format(
+            catalogue,
+            sql.Identifier(grade_column),
+            sql.Identifier(discipline_column),
+            sql.Identifier(topic_column),
+            sql.Identifier(schema_name),
+            sql.Identifier(table_name),
+            sql.Identifier(topic_column),
+        ),
+        sql.SQL("CREATE INDEX ON {} ({}, {})").format(
+            catalogue,
+            sql.Identifier(grade_column),
+            sql.Identifier(discipline_column),
+        ),
+    ]
+
+
 def normalize_vector_value(value: Any) -> VectorValue | None:
     if is_missing_value(value):
         return None
@@ -289,6 +335,18 @@ def load_to_postgres(config: LoadConfig) -> None:
             config.ivfflat_lists,
         )
 
+    catalogue_columns = (config.grade_column, config.discipline_column, config.topic_column)
+    catalogue_sql: list[sql.Composed] = []
+    if all(column in dataframe.columns for column in catalogue_columns):
+        catalogue_sql = build_topic_catalogue_sql(
+            config.schema_name,
+            config.table_name,
+            config.topic_catalogue_table,
+            config.grade_column,
+            config.discipline_column,
+            config.topic_column,
+        )
+
     with psycopg.connect(config.database_url) as connection:
         with connection.cursor() as cursor:
             cursor.execute("CREATE EXTENSION IF NOT EXISTS vector")
@@ -305,6 +363,9 @@ def load_to_postgres(config: LoadConfig) -> None:
             cursor.execute(analyze_sql)
             if index_sql is not None:
                 cursor.execute(index_sql)
+            # Rebuilt in one transaction so readers see either the old or the new catalogue.
+            for statement in catalogue_sql:
+                cursor.execute(statement)
 
 
 if __name__ == "__main__":
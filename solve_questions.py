@@ -1,12 +1,11 @@
-import os
 from typing import Optional, Tuple
 from pathlib import Path
 from argparse import ArgumentParser
+import asyncio
 import logging
 import pandas as pd
 
-from openai import OpenAI
-from jinja2 import Environment, FileSystemLoader
+from openai import AsyncOpenAI
 
 from mriynyk.config import (
     DEFAULT_DISCIPLINE_COLUMN,
@@ -15,11 +14,12 @@ from mriynyk.config import (
     DEFAULT_SCHEMA_NAME,
     DEFAULT_TABLE_NAME,
     DEFAULT_VECTOR_COLUMN,
-    LAPA_PROVIDER_BASE_URL,
-    resolve_api_key,
     resolve_database_url,
 )
+from mriynyk.db import close_connection_pools
+from mriynyk.llm import LlmProvider, close_llm_clients, get_async_llm_client
 from mriynyk.models import Subject, Year
+from mriynyk.prompts import render_prompt
 from mriynyk.service import embed_query, fetch_closest_chapter_pages
 from dotenv import load_dotenv
 
@@ -29,9 +29,7 @@ DEFAULT_OPENAI_MODEL = "gpt-5.2"
 
 
 def _direct_explain_prompt(question: str) -> str:
-    env = Environment(loader=FileSystemLoader("prompts"))
-    template = env.get_template("direct_explain.j2")
-    prompt = template.render({"question": question})
+    prompt = render_prompt("direct_explain.j2", {"question": question})
     return prompt
 
 
@@ -40,9 +38,8 @@ def _format_choices(choices: Tuple[str, ...]) -> str:
 
 
 def _solve_question_prompt(question: str, choices: Tuple[str, ...], relevant_info: str) -> str:
-    env = Environment(loader=FileSystemLoader("prompts"))
-    template = env.get_template("solve_question.j2")
-    prompt = template.render(
+    prompt = render_prompt(
+        "solve_question.j2",
         {
             "question": question,
             "choices": _format_choices(choices),
@@ -52,16 +49,16 @@ def _solve_question_prompt(question: str, choices: Tuple[str, ...], relevant_inf
     return prompt
 
 
-def _request_text(
+async def _request_text(
     *,
-    client: OpenAI,
+    client: AsyncOpenAI,
     model_choice: str,
     model_name: str,
     prompt: str,
     max_tokens: int,
 ) -> Optional[str]:
     if model_choice == "openai":
-        response = client.responses.create(
+        response = await client.responses.create(
             model=model_name,
             input=prompt,
             temperature=0.7,
@@ -69,7 +66,7 @@ def _request_text(
         )
         return response.output_text
 
-    response = client.chat.completions.create(
+    response = await client.chat.completions.create(
         model=model_name,
         messages=[
             {"role": "user", "content": prompt}
@@ -79,7 +76,7 @@ def _request_text(
     )
     return response.choices[0].message.content
 
-def solve(
+async def solve(
     question: str,
     choices: Tuple[str],
     year: Year,
@@ -87,23 +84,16 @@ def solve(
     model_choice: str,
 ) -> Optional[int]:
     logger.info("Solving question for year=%s subject=%s", year, subject)
+    client = get_async_llm_client(LlmProvider(model_choice))
     if model_choice == "openai":
-        api_key = os.environ.get("OPENAI_API_KEY")
-        if not api_key:
-            raise ValueError("OPENAI_API_KEY missing in environment for --model openai.")
-        client = OpenAI(api_key=api_key)
         model_name = DEFAULT_OPENAI_MODEL
     else:
-        client = OpenAI(
-            api_key=resolve_api_key(),
-            base_url=LAPA_PROVIDER_BASE_URL,
-        )
         model_name = DEFAULT_LAPA_MODEL
 
     direct_explain_prompt = _direct_explain_prompt(question=question)
 
     logger.info("Requesting direct explanation")
-    direct_explain_text = _request_text(
+    direct_explain_text = await _request_text(
         client=client,
         model_choice=model_choice,
         model_name=model_name,
@@ -115,12 +105,12 @@ def solve(
         return None
 
     logger.info("Embedding direct explanation")
-    vector = embed_query(direct_explain_text)
+    vector = await embed_query(direct_explain_text)
     database_url = resolve_database_url(None)
     grade_value = year.value if isinstance(year, Year) else int(year)
     discipline_name = subject.value if isinstance(subject, Subject) else str(subject)
     logger.info("Fetching relevant info from database")
-    closest_chapter_pages = fetch_closest_chapter_pages(
+    closest_chapter_pages = await fetch_closest_chapter_pages(
         database_url=database_url,
         vector=vector,
         grade_value=grade_value,
@@ -132,7 +122,7 @@ def solve(
     solve_question_prompt = _solve_question_prompt(question=question, choices=choices, relevant_info=relevant_info)
 
     logger.info("Requesting final answer")
-    solve_question_text = _request_text(
+    solve_question_text = await _request_text(
         client=client,
         model_choice=model_choice,
         model_name=model_name,
@@ -149,21 +139,28 @@ def solve(
     return predicted_answer_index
 
 
-def solve_benchmark(path: Path, model_choice: str) -> None:
+async def solve_benchmark(path: Path, model_choice: str) -> None:
     logger.info("Loading parquet from %s", path)
     df = pd.read_parquet(path).head(5)
     logger.info("Solving %s questions", len(df))
-    def _solve_row(row: pd.Series) -> Optional[int]:
-        logger.info("Solving row %s", row.name)
-        return solve(
-            question=row.question_text,
-            choices=row.answers,
-            year=row.grade,
-            subject=row.global_discipline_name,
-            model_choice=model_choice,
-        )
-
-    df["predicted_answer_index"] = df.apply(_solve_row, axis=1)
+    predicted_answer_indices: list[Optional[int]] = []
+    try:
+        for row in df.itertuples():
+            logger.info("Solving row %s", row.Index)
+            predicted_answer_indices.append(
+                await solve(
+                    question=row.question_text,
+                    choices=row.answers,
+                    year=row.grade,
+                    subject=row.global_discipline_name,
+                    model_choice=model_choice,
+                )
+            )
+    finally:
+        await close_connection_pools()
+        await close_llm_clients()
+
+    df["predicted_answer_index"] = predicted_answer_indices
     print(df.head)
 
 if __name__ == "__main__":
@@ -185,4 +182,4 @@ if __name__ == "__main__":
     )
     args = parser.parse_args()
 
-    solve_benchmark(path=args.path, model_choice=args.model)
+    asyncio.run(solve_benchmark(path=args.path, model_choice=args.model))